@@ -2,12 +2,18 @@
 Gradio interface for the Qdrant Hackathon project.
 """
 
+import asyncio
 import gradio as gr
+import hashlib
 import os
-import json
+import stat
+import tempfile
+import threading
+import time
 import pandas as pd
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
 
 from config import Config
 from image_processor import ImageProcessor
@@ -15,130 +21,246 @@ from utils import validate_file_path, get_image_files_from_directory
 
 # Initialize the image processor
 processor = None
+_init_lock = threading.Lock()
+
+# Worker threads used to prepare result thumbnails for the gallery
+RESULT_LOADER_WORKERS = 8
+
+# Gallery previews do not need full resolution pixels
+GALLERY_THUMBNAIL_SIZE = 512
+
+# Number of concurrent requests allowed for the heavy click handlers
+HANDLER_CONCURRENCY_LIMIT = 4
+
+# Uploads waiting in the queue are processed together, up to this many
+UPLOAD_MAX_BATCH_SIZE = 16
+
+# Requests the Gradio queue holds before rejecting new ones
+QUEUE_MAX_SIZE = 64
+
+# Seconds a rendered system status is reused before probing the backends again
+STATUS_CACHE_TTL = 5.0
+_status_cache = {"ts": 0.0, "value": None}
 
 
 def initialize_processor():
     """Initialize the image processor."""
     global processor
     if processor is None:
-        processor = ImageProcessor()
+        # Concurrent first requests must not load the models twice
+        with _init_lock:
+            if processor is None:
+                processor = ImageProcessor()
     return processor
 
 
-def get_system_status():
-    """Get system status for display."""
+async def get_system_status(force_refresh=False):
+    """Get system status for display, reusing a recent result if available."""
+    now = time.monotonic()
+    if (
+        not force_refresh
+        and _status_cache["value"] is not None
+        and now - _status_cache["ts"] < STATUS_CACHE_TTL
+    ):
+        return _status_cache["value"]
+
+    status_text = await _build_system_status()
+    if not status_text.startswith("Error getting system status"):
+        _status_cache["value"] = status_text
+        _status_cache["ts"] = now
+    return status_text
+
+
+async def force_refresh_system_status():
+    """Probe the backends again, bypassing the status cache."""
+    return await get_system_status(force_refresh=True)
+
+
+async def _build_system_status():
+    """Probe all backends and format the system status for display."""
     try:
-        processor = initialize_processor()
-        status = processor.check_system_status()
+        processor = await asyncio.to_thread(initialize_processor)
+        status = await processor.check_system_status_async()
 
         # Format status for display
-        status_text = f"System Status: {status['overall_status'].upper()}\n\n"
+        parts = [f"System Status: {status['overall_status'].upper()}\n\n"]
 
         for component, info in status["components"].items():
-            status_text += f"**{component.upper()}:** {info.get('status', 'unknown')}\n"
+            parts.append(f"**{component.upper()}:** {info.get('status', 'unknown')}\n")
             if info.get("status") == "error":
-                status_text += f"  Error: {info.get('error', 'Unknown error')}\n"
+                parts.append(f"  Error: {info.get('error', 'Unknown error')}\n")
             elif component == "clip" and info.get("status") == "loaded":
-                status_text += (
+                parts.append(
                     f"  Model: {info['model_info'].get('model_name', 'Unknown')}\n"
-                )
-                status_text += (
                     f"  Device: {info['model_info'].get('device', 'Unknown')}\n"
                 )
             elif component == "ollama" and info.get("status") == "connected":
-                status_text += (
+                parts.append(
                     f"  Model: {info['model_info'].get('model_name', 'Unknown')}\n"
                 )
             elif component == "qdrant" and info.get("status") == "connected":
-                collections = info.get("collections", {})
-                total_collections = len(collections)
-                active_collections = sum(
-                    1 for c in collections.values() if "error" not in c
-                )
-                status_text += (
-                    f"  Collections: {active_collections}/{total_collections} active\n"
+                parts.append(
+                    f"  Collections: {info.get('active_collections', 0)}/"
+                    f"{info.get('total_collections', 0)} active\n"
                 )
-            status_text += "\n"
+            parts.append("\n")
 
-        return status_text
+        return "".join(parts)
     except Exception as e:
         return f"Error getting system status: {e}"
 
 
-def process_single_image_interface(image_file):
-    """Process a single uploaded image."""
+async def process_single_image_interface(image_files):
+    """Process uploaded images, batched by the Gradio queue."""
+    try:
+        processor = await asyncio.to_thread(initialize_processor)
+
+        # Embed all uploads of the batch with one CLIP forward pass
+        paths = [f for f in image_files if f is not None]
+        batch_features = (
+            await asyncio.to_thread(
+                processor.clip_processor.get_image_features_batch, paths
+            )
+            if paths
+            else []
+        )
+        features_by_path = dict(zip(paths, batch_features))
+
+        outputs = await asyncio.gather(
+            *(
+                _process_uploaded_image(
+                    processor, image_file, features_by_path.get(image_file)
+                )
+                for image_file in image_files
+            )
+        )
+    except Exception as e:
+        outputs = [(f"Error processing image: {e}", None, None, None)] * len(
+            image_files
+        )
+
+    # Batched handlers return one list per output component
+    return tuple(list(column) for column in zip(*outputs))
+
+
+async def _process_uploaded_image(processor, image_file, batch_features):
+    """Process a single uploaded image with its precomputed CLIP features."""
     try:
         if image_file is None:
             return "Please upload an image", None, None, None
 
-        # Save uploaded file temporarily
-        temp_path = f"temp_upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-        image_file.save(temp_path)
+        features, clip_error = batch_features or (None, None)
 
-        # Process the image
-        processor = initialize_processor()
-        result, error = processor.process_single_image(temp_path)
-
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        # Gradio already stored the upload on disk, process it in place
+        result, error = await asyncio.to_thread(
+            processor.process_single_image,
+            image_file,
+            clip_features=None if clip_error else features,
+        )
 
         if error:
             return f"Error: {error}", None, None, None
 
         # Format results for display
         status = result.get("overall_status", "unknown")
-        status_text = f"**Processing Status:** {status.upper()}\n\n"
+        status_parts = [f"**Processing Status:** {status.upper()}\n\n"]
 
         # Add steps information
         steps = result.get("steps", {})
         for step_name, step_info in steps.items():
-            status_text += f"**{step_name.replace('_', ' ').title()}:** {step_info.get('status', 'unknown')}\n"
+            status_parts.append(
+                f"**{step_name.replace('_', ' ').title()}:** {step_info.get('status', 'unknown')}\n"
+            )
             if step_info.get("status") == "success":
                 if step_name == "gps" and step_info.get("coordinates"):
-                    status_text += (
+                    status_parts.append(
                         f"  Location: {step_info.get('location', 'Unknown')}\n"
+                        f"  Coordinates: {step_info['coordinates']}\n"
                     )
-                    status_text += f"  Coordinates: {step_info['coordinates']}\n"
                 elif step_name == "ollama":
-                    status_text += f"  Tags: {', '.join(result.get('tags', []))}\n"
+                    status_parts.append(f"  Tags: {', '.join(result.get('tags', []))}\n")
                 elif step_name == "clip":
-                    status_text += f"  Vector size: {step_info.get('vector_size', 0)}\n"
-            status_text += "\n"
+                    status_parts.append(
+                        f"  Vector size: {step_info.get('vector_size', 0)}\n"
+                    )
+            status_parts.append("\n")
+        status_text = "".join(status_parts)
 
         # Create metadata display
-        metadata_text = "**Image Metadata:**\n\n"
-        metadata_text += f"**Filename:** {result.get('filename', 'Unknown')}\n"
-        metadata_text += f"**Tags:** {', '.join(result.get('tags', []))}\n"
-        metadata_text += (
-            f"**Description:** {result.get('description', 'No description')}\n"
-        )
+        metadata_parts = [
+            "**Image Metadata:**\n\n",
+            f"**Filename:** {result.get('filename', 'Unknown')}\n",
+            f"**Tags:** {', '.join(result.get('tags', []))}\n",
+            f"**Description:** {result.get('description', 'No description')}\n",
+        ]
 
         if result.get("location"):
-            metadata_text += f"**Location:** {result['location']}\n"
+            metadata_parts.append(f"**Location:** {result['location']}\n")
 
         if result.get("coordinates"):
-            metadata_text += f"**GPS:** {result['coordinates']}\n"
+            metadata_parts.append(f"**GPS:** {result['coordinates']}\n")
 
-        metadata_text += f"**Processed:** {result.get('processed_at', 'Unknown')}\n"
+        metadata_parts.append(f"**Processed:** {result.get('processed_at', 'Unknown')}\n")
+        metadata_text = "".join(metadata_parts)
 
-        # Create search results (empty for now, will be populated when search is performed)
-        search_results = []
+        # Similar images (empty for now, will be populated when search is performed)
+        similar_results = []
 
-        return status_text, metadata_text, search_results, None
+        return status_text, metadata_text, similar_results, None
 
     except Exception as e:
         return f"Error processing image: {e}", None, None, None
 
 
-def perform_new_search(search_type, query_image=None, search_text="", search_tags=""):
-    """Search for similar images with forced fresh execution."""
+def _thumb_for(image_path):
+    """Get a cached gallery thumbnail for an image, returning the error on failure."""
     try:
-        # Add a unique identifier to ensure fresh results and prevent caching
-        import time
+        mtime = os.stat(image_path).st_mtime
+        key = hashlib.blake2b(image_path.encode(), digest_size=8).hexdigest()
+        thumb_path = os.path.join(Config.THUMBNAIL_DIR, f"{key}_{int(mtime)}.webp")
+        if not os.path.exists(thumb_path):
+            os.makedirs(Config.THUMBNAIL_DIR, exist_ok=True)
+            temp_path = None
+            try:
+                with Image.open(image_path) as img:
+                    # Let libjpeg decode at a reduced scale, no-op for other formats
+                    img.draft("RGB", (GALLERY_THUMBNAIL_SIZE, GALLERY_THUMBNAIL_SIZE))
+                    if img.mode not in ("RGB", "RGBA"):
+                        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+                    img.thumbnail((GALLERY_THUMBNAIL_SIZE, GALLERY_THUMBNAIL_SIZE))
+                    # Unique temp name so concurrent searches never see a partial file
+                    with tempfile.NamedTemporaryFile(
+                        suffix=".webp", delete=False, dir=Config.THUMBNAIL_DIR
+                    ) as tf:
+                        temp_path = tf.name
+                        img.save(tf, "WEBP", quality=80)
+                os.replace(temp_path, thumb_path)
+                temp_path = None
+            finally:
+                # Only set when the thumbnail was not moved into place
+                if temp_path:
+                    try:
+                        os.unlink(temp_path)
+                    except FileNotFoundError:
+                        pass
+        return thumb_path, None
+    except Exception as e:
+        return None, e
+
 
-        search_id = f"search_{int(time.time() * 1000)}"
+def _load_result_images(image_paths):
+    """Get thumbnails for result images concurrently, preserving input order."""
+    if not image_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=RESULT_LOADER_WORKERS) as executor:
+        return list(executor.map(_thumb_for, image_paths))
 
+
+async def perform_new_search(
+    search_type, query_image=None, search_text="", search_tags=""
+):
+    """Search for similar images."""
+    try:
         # Reset input parameters to ensure fresh state
         if search_type == "image":
             search_text = ""  # Clear text when doing image search
@@ -146,16 +268,7 @@ def perform_new_search(search_type, query_image=None, search_text="", search_tag
         else:  # text search
             query_image = None  # Clear image when doing text search
 
-        # Force completely fresh results by using different data structures
-        processor = initialize_processor()
-
-        # Prepare search parameters with cleaned inputs
-        query_text = search_text.strip() if search_text else None
-        search_tags_list = (
-            [tag.strip() for tag in search_tags.split(",") if tag.strip()]
-            if search_tags
-            else None
-        )
+        processor = await asyncio.to_thread(initialize_processor)
 
         # Prepare search parameters
         query_path = None
@@ -167,36 +280,28 @@ def perform_new_search(search_type, query_image=None, search_text="", search_tag
         )
 
         if search_type == "image" and query_image is not None:
-            # Copy the image to a temporary location to ensure it persists
-            import shutil
-
-            temp_path = f"temp_search_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-            try:
-                shutil.copy2(query_image, temp_path)
-                query_path = temp_path
-            except Exception as e:
-                print(f"Error copying image: {e}")
-                return [], f"Error processing query image: {e}"
+            # Gradio keeps the uploaded query image on disk, use it directly
+            query_path = query_image
 
         # Perform search
-        results, error = processor.search_images(
+        results, error = await asyncio.to_thread(
+            processor.search_images,
             query_image_path=query_path,
             text_query=query_text,
             tags=search_tags_list,
             limit=10,
         )
 
-        # Clean up temp file
-        if query_path and os.path.exists(query_path):
-            os.remove(query_path)
-
         if error:
             return [], None, f"Search error: {error}"
 
         # Format results for gallery
         gallery_images = []
-        metadata_text = "**Search Results Metadata:**\n\n"
+        metadata_parts = ["**Search Results Metadata:**\n\n"]
 
+        # First pass: score filtering and collecting the images to decode
+        entries = []
+        paths_to_load = []
         for i, result in enumerate(results.get("results", [])):
             payload = result.get("payload", {})
             image_path = payload.get("file_path")
@@ -216,147 +321,166 @@ def perform_new_search(search_type, query_image=None, search_text="", search_tag
             # Only apply score filtering for image searches (vector similarity), not text searches (metadata)
             if search_type == "image" and score <= 0.6:
                 print(f"DEBUG: Filtering out image search result with score {score:.3f} (<= 0.6)")
-                metadata_text += f"--- Result {i + 1} (FILTERED OUT) ---\n"
-                metadata_text += f"**File Path:** {image_path}\n"
-                metadata_text += f"**Score:** {score:.3f} (<= 0.6 - filtered out)\n\n"
+                entries.append((i, "filtered", image_path, payload, score, distance))
                 continue
             else:
                 print(f"DEBUG: Keeping metadata search result with score {score:.3f} (no score filter for text search)")
 
-            if image_path and os.path.exists(image_path):
-                try:
-                    from PIL import Image
+            # Existence is checked by the thumbnail workers' own stat
+            if image_path:
+                entries.append((i, "load", image_path, payload, score, distance))
+                paths_to_load.append(image_path)
+            else:
+                entries.append((i, "missing", image_path, payload, score, distance))
 
-                    img = Image.open(image_path)
+        # Fetch cached thumbnails in parallel, off the event loop
+        loaded_images = iter(
+            await asyncio.to_thread(_load_result_images, paths_to_load)
+        )
 
-                    # Create label with metadata
-                    tags = payload.get("ai_tags", [])
-                    location = payload.get("location_name", "")
-                    label_parts = [f"Score: {score:.3f} ({distance})"]
-                    if tags:
-                        label_parts.append(
-                            f"Tags: {', '.join(tags[:3])}{'...' if len(tags) > 3 else ''}"
-                        )
-                    if location:
-                        label_parts.append(f"Location: {location}")
+        # Second pass: build gallery and metadata in result order
+        for i, kind, image_path, payload, score, distance in entries:
+            if kind == "filtered":
+                metadata_parts.append(
+                    f"--- Result {i + 1} (FILTERED OUT) ---\n"
+                    f"**File Path:** {image_path}\n"
+                    f"**Score:** {score:.3f} (<= 0.6 - filtered out)\n\n"
+                )
+                continue
 
-                    label = " | ".join(label_parts)
-                    gallery_images.append((img, label))
+            if kind == "missing":
+                metadata_parts.append(f"--- Result {i + 1} ---\nImage file not found\n\n")
+                continue
 
-                    # Add detailed metadata for this result
-                    metadata_text += f"--- Result {i + 1} ---\n"
-                    metadata_text += f"**File Path:** {image_path}\n"
-                    metadata_text += (
-                        f"**File Name:** {payload.get('file_name', 'Unknown')}\n"
-                    )
-                    metadata_text += (
-                        f"**AI Tags:** {', '.join(tags) if tags else 'None'}\n"
-                    )
-                    metadata_text += (
-                        f"**Location:** {location if location else 'None'}\n"
-                    )
-                    metadata_text += f"**AI Description:** {payload.get('ai_description', 'No description')}\n"
-                    metadata_text += f"**Score:** {score:.3f}\n\n"
+            thumb_path, load_error = next(loaded_images)
+            if isinstance(load_error, FileNotFoundError):
+                metadata_parts.append(f"--- Result {i + 1} ---\nImage file not found\n\n")
+                continue
+            if load_error is not None:
+                print(f"Error loading image {image_path}: {load_error}")
+                metadata_parts.append(
+                    f"--- Result {i + 1} ---\nError loading image: {load_error}\n\n"
+                )
+                continue
 
-                except Exception as e:
-                    print(f"Error loading image {image_path}: {e}")
-                    metadata_text += (
-                        f"--- Result {i + 1} ---\nError loading image: {e}\n\n"
-                    )
-            else:
-                metadata_text += f"--- Result {i + 1} ---\nImage file not found\n\n"
-
-        # Force completely fresh results by using different data structures
-        if results.get("results"):
-            # Create completely fresh gallery images list
-            fresh_gallery = []
-            for img_data in gallery_images:
-                # Create new tuple to prevent reference issues
-                fresh_gallery.append((img_data[0], img_data[1] + f" | ID:{search_id}"))
-
-            # Create completely fresh metadata
-            fresh_metadata = (
-                f"=== FRESH SEARCH RESULTS ({search_id}) ===\n{metadata_text}"
+            # Create label with metadata
+            tags = payload.get("ai_tags", [])
+            location = payload.get("location_name", "")
+            label_parts = [f"Score: {score:.3f} ({distance})"]
+            if tags:
+                label_parts.append(
+                    f"Tags: {', '.join(tags[:3])}{'...' if len(tags) > 3 else ''}"
+                )
+            if location:
+                label_parts.append(f"Location: {location}")
+
+            label = " | ".join(label_parts)
+            # Gallery serves the thumbnail file directly
+            gallery_images.append((thumb_path, label))
+
+            # Add detailed metadata for this result
+            metadata_parts.append(
+                f"--- Result {i + 1} ---\n"
+                f"**File Path:** {image_path}\n"
+                f"**File Name:** {payload.get('file_name', 'Unknown')}\n"
+                f"**AI Tags:** {', '.join(tags) if tags else 'None'}\n"
+                f"**Location:** {location if location else 'None'}\n"
+                f"**AI Description:** {payload.get('ai_description', 'No description')}\n"
+                f"**Score:** {score:.3f}\n\n"
             )
-            return fresh_gallery, fresh_metadata, None
-        else:
-            # Return completely different structure for no results
-            return [], f"=== NO RESULTS FOUND ({search_id}) ===", None
+
+        metadata_text = "".join(metadata_parts)
+
+        if not results.get("results"):
+            return [], "=== NO RESULTS FOUND ===", None
+
+        # Each event sends its own outputs, no cache busting needed
+        return gallery_images, metadata_text, None
 
     except Exception as e:
         return [], None, f"Search interface error: {e}"
 
 
-def search_images_interface(
-    search_type, query_image=None, search_text="", search_tags=""
-):
-    """Legacy search function - not used."""
-    return [], "This function is deprecated. Use perform_new_search instead.", None
+def _format_bulk_summary(total_images, successful, failed):
+    """Format the bulk processing summary text."""
+    return (
+        "**Bulk Processing Summary:**\n\n"
+        f"**Total Images:** {total_images}\n"
+        f"**Successful:** {successful}\n"
+        f"**Failed:** {failed}\n\n"
+    )
+
+
+BULK_RESULT_COLUMNS = ("Filename", "Status", "Error", "Tags", "Location")
+
 
+def _append_bulk_result(columns, result):
+    """Append one processed image to the column lists of the results table."""
+    data = result.get("data", {})
+    columns["Filename"].append(os.path.basename(result.get("image_path", "Unknown")))
+    columns["Status"].append(result.get("status", "unknown"))
+    columns["Error"].append(result.get("error", ""))
+    columns["Tags"].append(", ".join(data.get("ai_tags", [])))
+    columns["Location"].append(data.get("location_name") or "")
 
-def process_bulk_interface(directory_path, max_images=10):
-    """Process multiple images in a directory."""
+
+def process_bulk_interface(directory_path, max_images=10, progress=gr.Progress()):
+    """Process multiple images in a directory, streaming progress to the UI."""
     try:
         if not directory_path.strip():
-            return "Please enter a directory path", None
+            yield "Please enter a directory path", None, None
+            return
 
         directory_path = directory_path.strip()
 
         # Validate directory path
         if not validate_file_path(directory_path):
-            return "Directory path not allowed", None
+            yield "Directory path not allowed", None, None
+            return
 
-        if not os.path.exists(directory_path):
-            return f"Directory not found: {directory_path}", None
+        # One stat call answers both "exists" and "is a directory"
+        try:
+            st = os.stat(directory_path)
+        except FileNotFoundError:
+            yield f"Directory not found: {directory_path}", None, None
+            return
 
-        if not os.path.isdir(directory_path):
-            return f"Path is not a directory: {directory_path}", None
+        if not stat.S_ISDIR(st.st_mode):
+            yield f"Path is not a directory: {directory_path}", None, None
+            return
 
-        # Process images
+        # Find images to process
         processor = initialize_processor()
-        results, error = processor.process_bulk_images(directory_path, max_images)
+        image_files, error = processor.find_bulk_images(directory_path, max_images)
 
         if error:
-            return f"Error: {error}", None
-
-        # Create summary
-        total_images = results.get("total_images", 0)
-        successful = results.get("processed", 0)
-        failed = results.get("failed", 0)
-
-        summary_text = f"**Bulk Processing Summary:**\n\n"
-        summary_text += f"**Total Images:** {total_images}\n"
-        summary_text += f"**Successful:** {successful}\n"
-        summary_text += f"**Failed:** {failed}\n\n"
-
-        # Create detailed results table
-        if results.get("results"):
-            data = []
-            for result in results["results"]:
-                filename = os.path.basename(result.get("image_path", "Unknown"))
-                status = result.get("status", "unknown")
-                error = result.get("error", "")
-
-                if status == "success":
-                    data = data  # This would need to be populated with actual data from successful processing
-                else:
-                    data.append(
-                        {
-                            "Filename": filename,
-                            "Status": status,
-                            "Error": error,
-                            "Tags": "",
-                            "Location": "",
-                        }
-                    )
-
-            df = pd.DataFrame(data)
-            return summary_text, df, None
-
-        return summary_text, None, None
+            yield f"Error: {error}", None, None
+            return
+
+        total_images = len(image_files)
+        successful = 0
+        failed = 0
+        columns = {name: [] for name in BULK_RESULT_COLUMNS}
+        progress(0, desc="Processing images")
+        yield _format_bulk_summary(total_images, successful, failed), None, None
+
+        # Process images, updating summary and table after each one
+        for done, total, result in processor.process_bulk_images_iter(image_files):
+            if result.get("status") == "success":
+                successful += 1
+            else:
+                failed += 1
+            _append_bulk_result(columns, result)
+
+            progress(done / total, desc=f"Processed {done}/{total} images")
+            yield (
+                _format_bulk_summary(total_images, successful, failed),
+                pd.DataFrame(columns, copy=False),
+                None,
+            )
 
     except Exception as e:
-        return f"Error in bulk processing: {e}", None, None
+        yield f"Error in bulk processing: {e}", None, None
 
 
 def set_allowed_paths_interface(paths_text):
@@ -420,7 +544,14 @@ with gr.Blocks(theme=gr.themes.Monochrome()) as demo:
             )
         with gr.Column(scale=1):
             refresh_status = gr.Button("🔄 Refresh Status", variant="secondary")
-            refresh_status.click(fn=get_system_status, outputs=system_status)
+            force_refresh_status = gr.Button("⚡ Force Refresh", variant="secondary")
+            # Cheap (cached) handlers skip the queue and run directly
+            refresh_status.click(
+                fn=get_system_status, outputs=system_status, queue=False
+            )
+            force_refresh_status.click(
+                fn=force_refresh_system_status, outputs=system_status
+            )
 
     # Tabs
     with gr.Tabs():
@@ -493,9 +624,10 @@ with gr.Blocks(theme=gr.themes.Monochrome()) as demo:
                 fn=on_search_type_change,
                 inputs=search_type,
                 outputs=[text_search_row, image_search_row, search_text, search_tags],
+                queue=False,
             )
 
-            # Search function with forced fresh outputs
+            # Search function
             search_button.click(
                 fn=perform_new_search,
                 inputs=[
@@ -506,6 +638,7 @@ with gr.Blocks(theme=gr.themes.Monochrome()) as demo:
                 ],
                 outputs=[search_results, search_metadata, search_error],
                 show_progress="full",
+                concurrency_limit=HANDLER_CONCURRENCY_LIMIT,
             )
 
         # Tab 2: Single Image Upload
@@ -527,9 +660,9 @@ with gr.Blocks(theme=gr.themes.Monochrome()) as demo:
                         label="Image Metadata", lines=8, interactive=False
                     )
 
-                    #                    search_results = gr.Gallery(
-                    #                        label="Similar Images", columns=2, height=300, interactive=False
-                    #                    )
+                    upload_similar_results = gr.Gallery(
+                        label="Similar Images", columns=2, height=300, interactive=False
+                    )
 
                     processing_error = gr.Textbox(label="Error", interactive=False)
 
@@ -540,9 +673,12 @@ with gr.Blocks(theme=gr.themes.Monochrome()) as demo:
                 outputs=[
                     processing_status,
                     image_metadata,
-                    search_results,
+                    upload_similar_results,
                     processing_error,
                 ],
+                concurrency_limit=HANDLER_CONCURRENCY_LIMIT,
+                batch=True,
+                max_batch_size=UPLOAD_MAX_BATCH_SIZE,
             )
 
         # Tab 3: Bulk Processing
@@ -632,11 +768,19 @@ Server Port: {Config.SERVER_PORT}
 
             # Set paths function
             set_paths_button.click(
-                fn=set_allowed_paths_interface, inputs=new_paths, outputs=paths_status
+                fn=set_allowed_paths_interface,
+                inputs=new_paths,
+                outputs=paths_status,
+                queue=False,
             )
 
+# Bound the number of waiting requests
+demo.queue(max_size=QUEUE_MAX_SIZE)
+
 # Launch the interface
 if __name__ == "__main__":
+    if Config.EAGER_INIT:
+        initialize_processor().warm_up()
     demo.launch(
         server_name=Config.SERVER_NAME,
         server_port=Config.SERVER_PORT,
@@ -2,17 +2,34 @@
 CLIP processor for image vectorization using laion/clip-vit-b-32-laion2B-s34B-b79K.
 """
 
+import hashlib
 import os
+import tempfile
+import threading
 import time
-from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from PIL import Image
 import numpy as np
 import torch
-from transformers import AutoProcessor, AutoModel
+from transformers import AutoImageProcessor, AutoProcessor, AutoModel
 from sentence_transformers import SentenceTransformer
 
 from config import Config
-from utils import _sanitize_for_json
+from utils import _sanitize_for_json, compute_content_hash
+
+# Worker threads used to decode images for a batch
+IMAGE_LOADER_WORKERS = 8
+
+# Number of distinct texts whose embeddings are kept in memory
+TEXT_EMBEDDING_CACHE_SIZE = 2048
+
+# Batch sizes the compiled vision tower is specialized to; batches are padded
+# to the next one, larger batches are split. Stays below dynamo's default
+# recompile limit of 8 graphs per function.
+VISION_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
 
 
 class CLIPProcessor:
@@ -28,17 +45,87 @@ class CLIPProcessor:
         try:
             if self.model_path and os.path.exists(self.model_path):
                 # Use local model path
-                self.processor = AutoProcessor.from_pretrained(self.model_path)
-                self.model = AutoModel.from_pretrained(self.model_path)
-                print(f"Loaded CLIP model from local path: {self.model_path}")
+                model_source = self.model_path
+                load_message = f"Loaded CLIP model from local path: {self.model_path}"
             else:
                 # Use remote model
-                self.processor = AutoProcessor.from_pretrained(self.model_name)
-                self.model = AutoModel.from_pretrained(self.model_name)
-                print(f"Loaded CLIP model: {self.model_name}")
+                model_source = self.model_name
+                load_message = f"Loaded CLIP model: {self.model_name}"
+
+            self.processor = AutoProcessor.from_pretrained(model_source)
+            # Image-only preprocessing, skips the tokenizer for image embeddings
+            self.image_processor = AutoImageProcessor.from_pretrained(model_source)
+            self.model = AutoModel.from_pretrained(model_source)
+            print(load_message)
 
             self.model.to(self.device)
             self.model.eval()
+            if self.device.type == "cuda":
+                # FP16 is stable for CLIP inference and halves memory traffic
+                self.model = self.model.half()
+                torch.backends.cuda.matmul.allow_tf32 = True
+                torch.set_float32_matmul_precision("high")
+
+            # Compiled towers replay CUDA graphs, which are recorded per
+            # thread, so every compiled call runs on this one thread
+            self._compiled_executor = ThreadPoolExecutor(max_workers=1)
+
+            size = Config.CLIP_INPUT_SIZE
+            self.vision_encode = self._compile_encoder(
+                self.model.get_image_features,
+                "vision",
+                lambda: [
+                    {
+                        "pixel_values": torch.zeros(
+                            (batch, 3, size, size),
+                            device=self.device,
+                            dtype=self.model.dtype,
+                        )
+                    }
+                    for batch in VISION_BATCH_BUCKETS
+                ],
+            )
+            # The compiled vision tower only sees the bucketed batch sizes
+            self.vision_batch_buckets = (
+                VISION_BATCH_BUCKETS
+                if self.vision_encode is not self.model.get_image_features
+                else None
+            )
+            # The compiled text tower is specialized to one padded length
+            text_length = self.model.config.text_config.max_position_embeddings
+            self.text_encode = self._compile_encoder(
+                self.model.get_text_features,
+                "text",
+                lambda: [
+                    {
+                        "input_ids": torch.zeros(
+                            (1, text_length), device=self.device, dtype=torch.long
+                        ),
+                        "attention_mask": torch.ones(
+                            (1, text_length), device=self.device, dtype=torch.long
+                        ),
+                    }
+                ],
+            )
+            self.text_pad_length = (
+                text_length
+                if self.text_encode is not self.model.get_text_features
+                else None
+            )
+
+            # Image embeddings by content hash, one directory per model
+            self._emb_cache_dir = os.path.join(
+                Config.CACHE_DIR,
+                "clip_emb",
+                hashlib.blake2b(self.model_name.encode(), digest_size=8).hexdigest(),
+            )
+            self._emb_cache_lock = threading.Lock()
+            self._emb_cache_count = None  # Counted on the first store
+
+            # Repeated queries and status probes reuse earlier encodings
+            self._cached_text_embedding = lru_cache(maxsize=TEXT_EMBEDDING_CACHE_SIZE)(
+                self._compute_text_embedding
+            )
 
             # Initialize sentence transformer for text embeddings
             self.sentence_model = SentenceTransformer("all-MiniLM-L6-v2")
@@ -49,6 +136,46 @@ class CLIPProcessor:
         except Exception as e:
             raise Exception(f"Failed to initialize CLIP model: {e}")
 
+    def _compile_encoder(self, encode, name: str, make_dummy_inputs):
+        """
+        Compile a CLIP tower for a fixed set of input shapes.
+
+        Args:
+            encode: Eager encoder method of the model
+            name: Tower name for the log messages
+            make_dummy_inputs: Builds one warm-up input dict per shape to specialize
+
+        Returns:
+            The compiled callable, or the eager method if compilation fails
+        """
+        if not Config.CLIP_COMPILE or self.device.type != "cuda":
+            return encode
+
+        try:
+            compiled = torch.compile(
+                encode,
+                mode="reduce-overhead",
+                fullgraph=False,
+                dynamic=False,
+            )
+
+            def run_compiled(inputs):
+                with torch.inference_mode():
+                    # The next replay overwrites the graph's output buffer
+                    return compiled(**inputs).clone()
+
+            def encode_compiled(**inputs):
+                return self._compiled_executor.submit(run_compiled, inputs).result()
+
+            # Pay the compile cost at startup instead of on the first request
+            for inputs in make_dummy_inputs():
+                encode_compiled(**inputs)
+            print(f"Compiled CLIP {name} encoder")
+            return encode_compiled
+        except Exception as e:
+            print(f"torch.compile unavailable, using eager CLIP {name} encoder: {e}")
+            return encode
+
     def check_connection(self) -> tuple[bool, Optional[str]]:
         """Check if CLIP model is loaded and working."""
         try:
@@ -62,37 +189,162 @@ class CLIPProcessor:
         except Exception as e:
             return False, f"CLIP model error: {e}"
 
-    def get_image_embedding(self, image_path: str) -> tuple[np.ndarray, Optional[str]]:
+    def _load_image(self, image_path: str) -> Tuple[Image.Image, Tuple[int, int]]:
         """
-        Get image embedding from image file.
+        Load an image as RGB at a resolution just large enough for CLIP.
 
         Args:
             image_path: Path to the image file
 
         Returns:
-            Tuple of (embedding, error_message)
+            Tuple of (rgb_image, original_size)
+        """
+        with Image.open(image_path) as img:
+            original_size = img.size
+            # JPEGs are DCT-scaled while decoding, other formats are unaffected
+            draft_size = Config.CLIP_DECODE_SIZE
+            img.draft("RGB", (draft_size, draft_size))
+            return img.convert("RGB"), original_size
+
+    def _try_load_cached_or_image(
+        self, image_path: str, content_hash: Optional[str] = None
+    ) -> Tuple[
+        Optional[np.ndarray],
+        Optional[Image.Image],
+        Optional[Tuple[int, int]],
+        Optional[Exception],
+    ]:
+        """
+        Get a cached embedding or load the image, returning errors instead of raising.
+
+        Args:
+            image_path: Path to the image file
+            content_hash: Hash of the file from compute_content_hash, the cache
+                is only consulted when the caller already has it
+
+        Returns:
+            Tuple of (cached_embedding, rgb_image, original_size, error)
         """
         try:
-            # Load and preprocess image
-            image = Image.open(image_path).convert("RGB")
+            if content_hash and Config.CLIP_EMBEDDING_CACHE_MAX_FILES > 0:
+                cached = self._load_cached_embedding(content_hash)
+                if cached is not None:
+                    # Only the header is read for the size
+                    with Image.open(image_path) as img:
+                        return cached, None, img.size, None
+            image, original_size = self._load_image(image_path)
+            return None, image, original_size, None
+        except Exception as e:
+            return None, None, None, e
+
+    def _preprocess_images(self, images: List[Image.Image]) -> torch.Tensor:
+        """
+        Convert RGB images to CLIP pixel values on the host.
+
+        Args:
+            images: Loaded RGB PIL images
+
+        Returns:
+            Pixel value tensor, pinned for asynchronous copies on CUDA
+        """
+        # Only the vision tower is needed, so no dummy text input
+        inputs = self.image_processor(images=images, return_tensors="pt")
+        pixel_values = inputs["pixel_values"]
+        if self.device.type == "cuda":
+            pixel_values = pixel_values.pin_memory()
+        return pixel_values
+
+    def _encode_pixels(self, pixel_values: torch.Tensor) -> np.ndarray:
+        """
+        Encode preprocessed pixel values with a single model forward pass.
+
+        Args:
+            pixel_values: Tensor from _preprocess_images
+
+        Returns:
+            Normalized embeddings with one row per image
+        """
+        pixel_values = pixel_values.to(
+            self.device, dtype=self.model.dtype, non_blocking=True
+        )
+
+        # Get image features
+        with torch.inference_mode():
+            if self.vision_batch_buckets:
+                image_features = self._encode_bucketed(pixel_values)
+            else:
+                image_features = self.vision_encode(pixel_values=pixel_values)
 
-            # Process image - CLIP processor needs both text and image inputs
-            # We'll use a dummy text input since we only want image embeddings
-            inputs = self.processor(
-                text=["a photo"], images=image, return_tensors="pt", padding=True
+            # Normalize embeddings
+            image_features = torch.nn.functional.normalize(
+                image_features.float(), p=2, dim=1
             )
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            return image_features.cpu().numpy()
 
-            # Get image features
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                image_features = outputs.image_embeds
+    def _encode_bucketed(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """
+        Run the compiled vision tower on batch sizes it was specialized to.
 
-                # Normalize embeddings
-                image_features = torch.nn.functional.normalize(
-                    image_features, p=2, dim=1
-                )
-                embedding = image_features.cpu().numpy().flatten()
+        Args:
+            pixel_values: Pixel values already on the model device
+
+        Returns:
+            Image features with one row per input image
+        """
+        largest = self.vision_batch_buckets[-1]
+        features = []
+        for start in range(0, len(pixel_values), largest):
+            chunk = pixel_values[start : start + largest]
+            count = len(chunk)
+            bucket = next(b for b in self.vision_batch_buckets if b >= count)
+            if bucket > count:
+                # Zero images pad the batch, their rows are dropped below
+                padding = chunk.new_zeros((bucket - count, *chunk.shape[1:]))
+                chunk = torch.cat([chunk, padding])
+            features.append(self.vision_encode(pixel_values=chunk)[:count])
+        return torch.cat(features)
+
+    def _encode_images(self, images: List[Image.Image]) -> np.ndarray:
+        """
+        Encode RGB images with a single model forward pass.
+
+        Args:
+            images: Loaded RGB PIL images
+
+        Returns:
+            Normalized embeddings with one row per image
+        """
+        return self._encode_pixels(self._preprocess_images(images))
+
+    def get_image_embedding(
+        self, image_path: str, content_hash: Optional[str] = None
+    ) -> tuple[np.ndarray, Optional[str]]:
+        """
+        Get image embedding from image file.
+
+        Args:
+            image_path: Path to the image file
+            content_hash: Hash of the file from compute_content_hash, computed
+                here if not given
+
+        Returns:
+            Tuple of (embedding, error_message)
+        """
+        try:
+            # Hashing is cheaper than a decode and forward pass, so repeated
+            # query images are worth the read
+            if Config.CLIP_EMBEDDING_CACHE_MAX_FILES > 0:
+                content_hash = content_hash or compute_content_hash(image_path)
+                embedding = self._load_cached_embedding(content_hash)
+                if embedding is not None:
+                    return embedding, None
+
+            # Load and preprocess image
+            image, _ = self._load_image(image_path)
+
+            embedding = self._encode_images([image])[0]
+            if content_hash:
+                self.cache_embedding(content_hash, embedding)
 
             # DEBUG: Log embedding information
             print(f"DEBUG: CLIP model embedding dimension: {len(embedding)}")
@@ -103,6 +355,113 @@ class CLIPProcessor:
         except Exception as e:
             return np.array([]), f"Error getting image embedding: {e}"
 
+    def get_image_embedding_binarized(
+        self, image_path: str
+    ) -> tuple[np.ndarray, Optional[str]]:
+        """
+        Get the image embedding as 1-bit codes packed into bytes.
+
+        The sign bits match what Qdrant's binary quantization keeps for a
+        collection created with
+        ``quantization_config=models.BinaryQuantization(binary=...)``, so
+        callers can compare codes without the full precision vector.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Tuple of (packed_bits, error_message), 96 bytes for 768 dimensions
+        """
+        embedding, error = self.get_image_embedding(image_path)
+        if error:
+            return np.array([], dtype=np.uint8), error
+        return np.packbits((embedding > 0).astype(np.uint8)), None
+
+    def _embedding_cache_path(self, content_hash: str) -> str:
+        """Get the embedding cache file for an image content hash."""
+        return os.path.join(self._emb_cache_dir, f"{content_hash}.npy")
+
+    def _load_cached_embedding(self, content_hash: str) -> Optional[np.ndarray]:
+        """Load a cached embedding, or None if it is missing or unreadable."""
+        cache_path = self._embedding_cache_path(content_hash)
+        try:
+            return np.load(cache_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable embedding cache {cache_path}: {e}")
+            return None
+
+    def cache_embedding(self, content_hash: str, embedding: np.ndarray) -> None:
+        """
+        Store an image embedding, failures only cost a recompute.
+
+        Ingest rewrites the file's metadata, so callers store the embedding
+        under the hash of the final file rather than the one read first.
+
+        Args:
+            content_hash: Hash of the file from compute_content_hash
+            embedding: Image embedding to store
+        """
+        if Config.CLIP_EMBEDDING_CACHE_MAX_FILES <= 0:
+            return
+
+        cache_path = self._embedding_cache_path(content_hash)
+        temp_path = None
+        try:
+            os.makedirs(self._emb_cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                suffix=".tmp", delete=False, dir=self._emb_cache_dir
+            ) as tf:
+                temp_path = tf.name
+                np.save(tf, np.asarray(embedding, dtype=np.float32))
+            os.replace(temp_path, cache_path)
+            temp_path = None
+        except Exception as e:
+            print(f"Could not cache embedding {cache_path}: {e}")
+            return
+        finally:
+            if temp_path:
+                try:
+                    os.unlink(temp_path)
+                except FileNotFoundError:
+                    pass
+
+        with self._emb_cache_lock:
+            if self._emb_cache_count is None:
+                self._emb_cache_count = len(self._scan_embedding_cache())
+            else:
+                self._emb_cache_count += 1
+            if self._emb_cache_count > Config.CLIP_EMBEDDING_CACHE_MAX_FILES:
+                self._evict_embeddings()
+
+    def _scan_embedding_cache(self) -> List[Tuple[float, str]]:
+        """List the cached embedding files as (mtime, path)."""
+        entries = []
+        try:
+            with os.scandir(self._emb_cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".npy"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except FileNotFoundError:
+                            pass
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _evict_embeddings(self) -> None:
+        """Delete the oldest cached embeddings down to 90% of the size cap."""
+        entries = sorted(self._scan_embedding_cache())
+        keep = int(Config.CLIP_EMBEDDING_CACHE_MAX_FILES * 0.9)
+        excess = max(0, len(entries) - keep)
+        for _, path in entries[:excess]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._emb_cache_count = len(entries) - excess
+
     def get_text_embedding(self, text: str) -> np.ndarray:
         """
         Get text embedding using CLIP model for consistency.
@@ -111,74 +470,239 @@ class CLIPProcessor:
             text: Input text
 
         Returns:
-            Text embedding as numpy array
+            Text embedding as numpy array (read-only, shared between callers)
         """
         try:
-            # Use CLIP model for text embeddings
-            inputs = self.processor(text=[text], return_tensors="pt", padding=True)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            # Both tokenizers lowercase and collapse whitespace, so queries that
+            # differ only in case or spacing share a cache entry
+            return self._cached_text_embedding(" ".join(text.split()).lower())
+        except Exception as e:
+            print(f"Error getting text embedding: {e}")
 
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                text_features = outputs.text_embeds
+        try:
+            # Fallback to sentence transformer if CLIP fails. Not cached, so a
+            # transient CLIP error does not pin this embedding to the query
+            return self.sentence_model.encode(text)
+        except Exception as fallback_e:
+            print(f"Fallback also failed: {fallback_e}")
+            return np.array([])
+
+    def _compute_text_embedding(self, text: str) -> np.ndarray:
+        """Encode text with CLIP, raising on failure so nothing is cached."""
+        # Use CLIP model for text embeddings, text tower only
+        if self.text_pad_length:
+            # Same shape as the compiled graph, padding is masked out
+            inputs = self.processor.tokenizer(
+                [text],
+                return_tensors="pt",
+                padding="max_length",
+                max_length=self.text_pad_length,
+                truncation=True,
+            )
+        else:
+            inputs = self.processor.tokenizer([text], return_tensors="pt", padding=True)
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
-                # Normalize embeddings
-                text_features = torch.nn.functional.normalize(
-                    text_features, p=2, dim=1
-                )
-                embedding = text_features.cpu().numpy().flatten()
+        with torch.inference_mode():
+            text_features = self.text_encode(**inputs)
 
-            # DEBUG: Log embedding information
-            print(f"DEBUG: CLIP text embedding dimension: {len(embedding)}")
-            
-            return embedding
-        except Exception as e:
-            print(f"Error getting text embedding: {e}")
-            # Fallback to sentence transformer if CLIP fails
-            try:
-                embedding = self.sentence_model.encode(text)
-                return embedding
-            except Exception as fallback_e:
-                print(f"Fallback also failed: {fallback_e}")
-                return np.array([])
+            # Normalize embeddings
+            text_features = torch.nn.functional.normalize(
+                text_features.float(), p=2, dim=1
+            )
+            embedding = text_features.cpu().numpy().flatten()
+
+        # DEBUG: Log embedding information
+        print(f"DEBUG: CLIP text embedding dimension: {len(embedding)}")
+
+        # Cached arrays are shared, so callers must not modify them
+        embedding.flags.writeable = False
+        return embedding
 
     def get_image_features(
-        self, image_path: str
+        self, image_path: str, content_hash: Optional[str] = None
     ) -> tuple[Dict[str, Any], Optional[str]]:
         """
         Get comprehensive image features including embedding and metadata.
 
         Args:
             image_path: Path to the image file
+            content_hash: Hash of the file, enables the embedding cache lookup
 
         Returns:
             Tuple of (features, error_message)
         """
         try:
-            # Get image embedding
-            embedding, error = self.get_image_embedding(image_path)
-            if error:
-                return {"error": error}, error
-
-            # Get image dimensions
-            with Image.open(image_path) as img:
-                width, height = img.size
-
-            # Create features dictionary
-            features = {
-                "embedding": embedding.tolist(),
-                "embedding_dim": len(embedding),
-                "image_path": image_path,
-                "image_size": {"width": width, "height": height},
-                "model_used": self.model_name,
-                "timestamp": time.time(),
-            }
-
-            return features, None
+            # The batch path takes the size from the decode it already does
+            return self.get_image_features_batch([image_path], [content_hash])[0]
 
         except Exception as e:
             return {"error": str(e)}, f"Error getting image features: {e}"
 
+    def _build_features(
+        self, image_path: str, embedding: np.ndarray, width: int, height: int
+    ) -> Dict[str, Any]:
+        """Create the features dictionary for an image embedding."""
+        return {
+            # Kept packed, converted to a list only when sent to Qdrant
+            "embedding": embedding.astype(np.float32, copy=False),
+            "embedding_dim": len(embedding),
+            "image_path": image_path,
+            "image_size": {"width": width, "height": height},
+            "model_used": self.model_name,
+            "timestamp": time.time_ns(),
+        }
+
+    def get_image_features_batch(
+        self,
+        image_paths: List[str],
+        content_hashes: Optional[List[Optional[str]]] = None,
+    ) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        """
+        Get image features for several images with one model forward pass.
+
+        Args:
+            image_paths: Paths to the image files
+            content_hashes: File hashes aligned with image_paths, enables the
+                embedding cache lookup for the images that have one
+
+        Returns:
+            List of (features, error_message) tuples aligned with image_paths
+        """
+        return self._encode_prepared_batch(
+            self._prepare_batch(image_paths, content_hashes)
+        )
+
+    def iter_image_features_batches(
+        self, image_paths: List[str], batch_size: int = 32
+    ) -> Iterator[List[Tuple[Dict[str, Any], Optional[str]]]]:
+        """
+        Get image features batch by batch, decoding the next batch in the background.
+
+        Args:
+            image_paths: Paths to the image files
+            batch_size: Number of images encoded per forward pass
+
+        Yields:
+            List of (features, error_message) tuples for each chunk of image_paths
+        """
+        chunks = [
+            image_paths[start : start + batch_size]
+            for start in range(0, len(image_paths), max(1, batch_size))
+        ]
+        if not chunks:
+            return
+
+        # Decode batch k+1 while batch k is encoded and consumed
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            pending = prefetcher.submit(self._prepare_batch, chunks[0])
+            for next_chunk in chunks[1:] + [None]:
+                prepared = pending.result()
+                if next_chunk is not None:
+                    pending = prefetcher.submit(self._prepare_batch, next_chunk)
+                yield self._encode_prepared_batch(prepared)
+
+    def _prepare_batch(
+        self,
+        image_paths: List[str],
+        content_hashes: Optional[List[Optional[str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Decode and preprocess a batch, resolving cached embeddings.
+
+        Args:
+            image_paths: Paths to the image files
+            content_hashes: File hashes aligned with image_paths, if known
+
+        Returns:
+            Batch state consumed by _encode_prepared_batch
+        """
+        outputs: List[Tuple[Dict[str, Any], Optional[str]]] = [None] * len(
+            image_paths
+        )
+        images = []
+        sizes = []
+        indices = []
+        pixel_values = None
+        preprocess_error = None
+
+        # Decoding is I/O and libjpeg bound, overlap it across threads
+        with ThreadPoolExecutor(max_workers=IMAGE_LOADER_WORKERS) as executor:
+            loaded = list(
+                executor.map(
+                    self._try_load_cached_or_image,
+                    image_paths,
+                    content_hashes or repeat(None),
+                )
+            )
+
+        for idx, (cached, image, original_size, error) in enumerate(loaded):
+            if error is not None:
+                outputs[idx] = (
+                    {"error": str(error)},
+                    f"Error getting image features: {error}",
+                )
+                continue
+            if cached is not None:
+                width, height = original_size
+                outputs[idx] = (
+                    self._build_features(image_paths[idx], cached, width, height),
+                    None,
+                )
+                continue
+            images.append(image)
+            sizes.append(original_size)
+            indices.append(idx)
+
+        if images:
+            try:
+                pixel_values = self._preprocess_images(images)
+            except Exception as e:
+                preprocess_error = e
+
+        return {
+            "image_paths": image_paths,
+            "outputs": outputs,
+            "sizes": sizes,
+            "indices": indices,
+            "pixel_values": pixel_values,
+            "error": preprocess_error,
+        }
+
+    def _encode_prepared_batch(
+        self, prepared: Dict[str, Any]
+    ) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        """Run the forward pass for a prepared batch and build its features."""
+        outputs = prepared["outputs"]
+        indices = prepared["indices"]
+        if not indices:
+            return outputs
+
+        try:
+            if prepared["error"] is not None:
+                raise prepared["error"]
+            embeddings = self._encode_pixels(prepared["pixel_values"])
+        except Exception as e:
+            for idx in indices:
+                outputs[idx] = (
+                    {"error": str(e)},
+                    f"Error getting image embedding: {e}",
+                )
+            return outputs
+
+        image_paths = prepared["image_paths"]
+        # Not cached here, the ingest path stores embeddings under the hash
+        # of the file after its metadata was written
+        for embedding, idx, (width, height) in zip(
+            embeddings, indices, prepared["sizes"]
+        ):
+            outputs[idx] = (
+                self._build_features(image_paths[idx], embedding, width, height),
+                None,
+            )
+
+        return outputs
+
     def search_similar_images(
         self, query_embedding: np.ndarray, limit: int = 10
     ) -> tuple[List[Dict[str, Any]], Optional[str]]:
@@ -233,13 +757,14 @@ class CLIPProcessor:
         return status
 
     def process_batch_images(
-        self, image_paths: List[str]
+        self, image_paths: List[str], batch_size: int = 32
     ) -> Tuple[List[Dict[str, Any]], List[str]]:
         """
         Process multiple images in batch.
 
         Args:
             image_paths: List of image paths to process
+            batch_size: Number of images encoded per forward pass
 
         Returns:
             Tuple of (results, failed_paths)
@@ -247,16 +772,14 @@ class CLIPProcessor:
         results = []
         failed_paths = []
 
-        for image_path in image_paths:
-            try:
-                features, error = self.get_image_features(image_path)
+        batches = self.iter_image_features_batches(image_paths, batch_size)
+        for k, batch_features in enumerate(batches):
+            chunk = image_paths[k * batch_size : (k + 1) * batch_size]
+            for image_path, (features, error) in zip(chunk, batch_features):
                 if error:
                     failed_paths.append(image_path)
                     print(f"Failed to process {image_path}: {error}")
                 else:
                     results.append(features)
-            except Exception as e:
-                failed_paths.append(image_path)
-                print(f"Error processing {image_path}: {e}")
 
         return results, failed_paths
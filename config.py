@@ -3,7 +3,20 @@ Configuration settings for the Qdrant Hackathon project.
 """
 
 import os
-from typing import List, Optional
+import tempfile
+from typing import FrozenSet, List, Optional, Tuple
+
+
+def _int_env(name: str, default: int) -> int:
+    """Read an integer environment variable."""
+    value = os.environ.get(name)
+    return default if value is None else int(value)
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    """Read a true/false environment variable."""
+    value = os.environ.get(name)
+    return default if value is None else value.lower() == "true"
 
 
 class Config:
@@ -12,8 +25,25 @@ class Config:
     # Qdrant Configuration
     QDRANT_HOST: str = "localhost"  # "10.84.0.7" #
     QDRANT_PORT: int = 6333
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = True  # Binary protobuf transport for points
     QDRANT_TIMEOUT: int = 120
+    QDRANT_HNSW_M: int = 16  # Graph links per node
+    QDRANT_HNSW_EF_CONSTRUCT: int = 128  # Build-time beam width
+    QDRANT_ON_DISK_PAYLOAD: bool = True  # Payloads are only read for results
+    QDRANT_MEMMAP_THRESHOLD: int = 20000  # KB per segment before memmapping
+    QDRANT_UPLOAD_PARALLEL: int = 4  # Upload workers for bulk_upsert
     COLLECTION_NAME: str = "image_db"
+    # Payload fields filtered on exact values, with their Qdrant index type
+    PAYLOAD_INDEXES: dict = {
+        "image_id": "keyword",
+        "content_hash": "keyword",
+        "ai_tags_lc": "keyword",
+        "ai_tags": "keyword",
+        "location_name": "keyword",
+    }
+    SEARCH_RESULT_CACHE_SIZE: int = 256  # Cached search results, 0 disables
+    SEARCH_RESULT_CACHE_TTL: int = 300  # Seconds a cached search result is valid
 
     # Ollama/OpenAI Configuration
     OLLAMA_BASE_URL: str = "http://localhost:11434/v1/" 
@@ -21,10 +51,14 @@ class Config:
         "mistral-small3.2:latest"
     )
     OLLAMA_API_KEY: str = "na"  # "ollama"
+    OLLAMA_TIMEOUT: int = 600  # Seconds per request, vision calls are slow
 
     # CLIP Model Configuration
     CLIP_MODEL_NAME: str = "openai/clip-vit-large-patch14"
     CLIP_MODEL_PATH: Optional[str] = None
+    CLIP_INPUT_SIZE: int = 224  # Input resolution of the CLIP vision encoder
+    CLIP_DECODE_SIZE: int = 256  # Minimum JPEG draft decode size for CLIP
+    CLIP_COMPILE: bool = True  # torch.compile the vision encoder on CUDA
 
     # Image Processing Configuration
     SUPPORTED_EXTENSIONS: List[str] = [
@@ -36,6 +70,11 @@ class Config:
         ".tiff",
         ".webp",
     ]
+    # Prebuilt forms for str.endswith and O(1) membership checks
+    SUPPORTED_EXTENSIONS_TUPLE: Tuple[str, ...] = tuple(SUPPORTED_EXTENSIONS)
+    SUPPORTED_EXTENSIONS_SET: FrozenSet[str] = frozenset(
+        ext.lower() for ext in SUPPORTED_EXTENSIONS
+    )
 
     # Gradio Configuration
     SERVER_NAME: str = "0.0.0.0"
@@ -45,24 +84,69 @@ class Config:
     # Allowed Paths Configuration
     ALLOWED_PATHS: List[str] = []
 
+    # Set once update_from_env has applied the environment
+    _env_loaded: bool = False
+
+    # Errors found by validate_config, reset when the settings change
+    _validation_cache: Optional[List[str]] = None
+    # Absolute allowed paths, reset when the settings change
+    _allowed_paths_cache: Optional[Tuple[str, ...]] = None
+
+    # Load the models at startup instead of on the first request
+    EAGER_INIT: bool = False
+
+    # Logging level name, --debug overrides it with DEBUG
+    LOG_LEVEL: str = "INFO"
+
     # Processing Configuration
     BATCH_SIZE: int = 10
+    BULK_WORKERS: int = 4  # Images of a batch processed concurrently
     MAX_IMAGE_SIZE: int = 1024  # Maximum image size for processing
+    MAX_IMAGE_BYTES: int = 100 * 1024 * 1024  # Larger files are not analysed
+    THUMBNAIL_DIR: str = "thumbs"  # Cache directory for gallery thumbnails
+    CACHE_DIR: str = "cache"  # Cache directory for computed embeddings
+    CLIP_EMBEDDING_CACHE_MAX_FILES: int = 10000  # Cached image embeddings, 0 disables
+    GEOCODE_CACHE_FILE: str = "geocode.sqlite3"  # Reverse geocoding cache in CACHE_DIR
+    QUERY_CACHE_SIZE: int = 256  # Number of recent text queries kept in memory
+
+    @classmethod
+    def get_upload_dir(cls) -> str:
+        """Get the directory where Gradio stores uploaded files."""
+        return os.getenv(
+            "GRADIO_TEMP_DIR", os.path.join(tempfile.gettempdir(), "gradio")
+        )
 
     @classmethod
     def get_allowed_paths(cls) -> List[str]:
         """Get allowed paths for file access."""
         if not cls.ALLOWED_PATHS:
             # Default to user's home directory and current working directory
-            home_dir = os.path.expanduser("~")
-            current_dir = os.getcwd()
-            return [home_dir, current_dir]
-        return cls.ALLOWED_PATHS
+            paths = [os.path.expanduser("~"), os.getcwd()]
+        else:
+            paths = list(cls.ALLOWED_PATHS)
+
+        # Uploads are processed in place, so Gradio's upload directory stays
+        # allowed alongside custom paths
+        upload_dir = cls.get_upload_dir()
+        if upload_dir not in paths:
+            paths.append(upload_dir)
+        return paths
+
+    @classmethod
+    def get_allowed_paths_tuple(cls) -> Tuple[str, ...]:
+        """Get the allowed paths as absolute paths, resolved once."""
+        if cls._allowed_paths_cache is None:
+            cls._allowed_paths_cache = tuple(
+                os.path.abspath(path) for path in cls.get_allowed_paths()
+            )
+        return cls._allowed_paths_cache
 
     @classmethod
     def set_allowed_paths(cls, paths: List[str]) -> None:
         """Set allowed paths for file access."""
         cls.ALLOWED_PATHS = paths
+        cls._validation_cache = None
+        cls._allowed_paths_cache = None
 
     @classmethod
     def get_qdrant_collection_name(cls, distance: str = "cosine") -> str:
@@ -91,33 +175,76 @@ class Config:
 
     @classmethod
     def update_from_env(cls) -> None:
-        """Update configuration from environment variables."""
+        """Update configuration from environment variables, once per process."""
+        if cls._env_loaded:
+            return
+        cls._env_loaded = True
+        cls._validation_cache = None
+        cls._allowed_paths_cache = None
+
+        env = os.environ
+
         # Qdrant settings
-        cls.QDRANT_HOST = os.getenv("QDRANT_HOST", cls.QDRANT_HOST)
-        cls.QDRANT_PORT = int(os.getenv("QDRANT_PORT", cls.QDRANT_PORT))
+        cls.QDRANT_HOST = env.get("QDRANT_HOST", cls.QDRANT_HOST)
+        cls.QDRANT_PORT = _int_env("QDRANT_PORT", cls.QDRANT_PORT)
+        cls.QDRANT_GRPC_PORT = _int_env("QDRANT_GRPC_PORT", cls.QDRANT_GRPC_PORT)
+        cls.QDRANT_PREFER_GRPC = _bool_env(
+            "QDRANT_PREFER_GRPC", cls.QDRANT_PREFER_GRPC
+        )
+        cls.SEARCH_RESULT_CACHE_SIZE = _int_env(
+            "SEARCH_RESULT_CACHE_SIZE", cls.SEARCH_RESULT_CACHE_SIZE
+        )
+        cls.SEARCH_RESULT_CACHE_TTL = _int_env(
+            "SEARCH_RESULT_CACHE_TTL", cls.SEARCH_RESULT_CACHE_TTL
+        )
+        cls.QDRANT_HNSW_M = _int_env("QDRANT_HNSW_M", cls.QDRANT_HNSW_M)
+        cls.QDRANT_HNSW_EF_CONSTRUCT = _int_env(
+            "QDRANT_HNSW_EF_CONSTRUCT", cls.QDRANT_HNSW_EF_CONSTRUCT
+        )
+        cls.QDRANT_ON_DISK_PAYLOAD = _bool_env(
+            "QDRANT_ON_DISK_PAYLOAD", cls.QDRANT_ON_DISK_PAYLOAD
+        )
+        cls.QDRANT_MEMMAP_THRESHOLD = _int_env(
+            "QDRANT_MEMMAP_THRESHOLD", cls.QDRANT_MEMMAP_THRESHOLD
+        )
+        cls.QDRANT_UPLOAD_PARALLEL = _int_env(
+            "QDRANT_UPLOAD_PARALLEL", cls.QDRANT_UPLOAD_PARALLEL
+        )
 
         # Ollama/OpenAI settings
-        cls.OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", cls.OLLAMA_BASE_URL)
-        cls.OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", cls.OLLAMA_MODEL)
-        cls.OLLAMA_API_KEY = os.getenv("OLLAMA_API_KEY", cls.OLLAMA_API_KEY)
+        cls.OLLAMA_BASE_URL = env.get("OLLAMA_BASE_URL", cls.OLLAMA_BASE_URL)
+        cls.OLLAMA_MODEL = env.get("OLLAMA_MODEL", cls.OLLAMA_MODEL)
+        cls.OLLAMA_API_KEY = env.get("OLLAMA_API_KEY", cls.OLLAMA_API_KEY)
+        cls.OLLAMA_TIMEOUT = _int_env("OLLAMA_TIMEOUT", cls.OLLAMA_TIMEOUT)
 
         # CLIP settings
-        cls.CLIP_MODEL_NAME = os.getenv("CLIP_MODEL_NAME", cls.CLIP_MODEL_NAME)
-        cls.CLIP_MODEL_PATH = os.getenv("CLIP_MODEL_PATH", cls.CLIP_MODEL_PATH)
+        cls.CLIP_MODEL_NAME = env.get("CLIP_MODEL_NAME", cls.CLIP_MODEL_NAME)
+        cls.CLIP_MODEL_PATH = env.get("CLIP_MODEL_PATH", cls.CLIP_MODEL_PATH)
+        cls.CLIP_COMPILE = _bool_env("CLIP_COMPILE", cls.CLIP_COMPILE)
+        cls.CLIP_EMBEDDING_CACHE_MAX_FILES = _int_env(
+            "CLIP_EMBEDDING_CACHE_MAX_FILES", cls.CLIP_EMBEDDING_CACHE_MAX_FILES
+        )
 
         # Server settings
-        cls.SERVER_NAME = os.getenv("SERVER_NAME", cls.SERVER_NAME)
-        cls.SERVER_PORT = int(os.getenv("SERVER_PORT", cls.SERVER_PORT))
-        cls.SHARE = os.getenv("SHARE", "false").lower() == "true"
+        cls.SERVER_NAME = env.get("SERVER_NAME", cls.SERVER_NAME)
+        cls.SERVER_PORT = _int_env("SERVER_PORT", cls.SERVER_PORT)
+        cls.SHARE = _bool_env("SHARE", False)
+
+        cls.EAGER_INIT = _bool_env("EAGER_INIT", cls.EAGER_INIT)
+        cls.LOG_LEVEL = env.get("LOG_LEVEL", cls.LOG_LEVEL).upper()
 
         # Allowed paths
-        allowed_paths_env = os.getenv("ALLOWED_PATHS")
+        allowed_paths_env = env.get("ALLOWED_PATHS")
         if allowed_paths_env:
             cls.set_allowed_paths(allowed_paths_env.split(":"))
 
     @classmethod
     def validate_config(cls) -> List[str]:
         """Validate the configuration and return a list of errors."""
+        # The allowed path checks hit the filesystem, validate once per change
+        if cls._validation_cache is not None:
+            return list(cls._validation_cache)
+
         errors = []
 
         # Validate Qdrant settings
@@ -153,4 +280,5 @@ class Config:
             if not os.path.exists(path):
                 errors.append(f"Allowed path does not exist: {path}")
 
-        return errors
+        cls._validation_cache = errors
+        return list(errors)
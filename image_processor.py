@@ -3,9 +3,15 @@ Main image processor that combines all processing steps.
 """
 
 import os
+import stat
 import time
 import uuid
-from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, repeat
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 from PIL import Image
 import piexif
@@ -15,9 +21,13 @@ from ollama_client import OllamaClient
 from clip_processor import CLIPProcessor
 from qdrant_manager import QdrantManager
 from utils import (
-    get_gps_coordinates,
+    compute_content_hash,
+    get_gps_coordinates_from_exif,
     get_location_from_coordinates,
     extract_and_add_metadata,
+    is_image_file,
+    iter_image_files,
+    load_exif_dict,
     validate_file_path,
     _sanitize_for_json,
 )
@@ -28,18 +38,64 @@ class ImageProcessor:
 
     def __init__(self):
         """Initialize the image processor."""
-        self.ollama_client = OllamaClient()
-        self.clip_processor = CLIPProcessor()
-        self.qdrant_manager = QdrantManager()
+        # No-op when the entry point already applied the environment
+        Config.update_from_env()
 
-        # Initialize Qdrant collections
-        success, message = self.qdrant_manager.create_collections()
-        if not success:
-            print(f"Warning: {message}")
+        # Backends are created on first use, see the properties below
+        self._ollama_client = None
+        self._clip_processor = None
+        self._qdrant_manager = None
+        self._backend_lock = threading.Lock()
+
+        # Single image embeddings run here while the AI analysis is pending
+        self._clip_executor = ThreadPoolExecutor(max_workers=1)
 
         # Set allowed paths
         Config.set_allowed_paths(Config.get_allowed_paths())
 
+        # Results of recent text queries by (text, tags, limit), oldest first
+        self._query_cache: OrderedDict = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+    @property
+    def ollama_client(self) -> OllamaClient:
+        """Ollama client, created on first access."""
+        if self._ollama_client is None:
+            with self._backend_lock:
+                if self._ollama_client is None:
+                    self._ollama_client = OllamaClient()
+        return self._ollama_client
+
+    @property
+    def clip_processor(self) -> CLIPProcessor:
+        """CLIP processor, loading the model on first access."""
+        if self._clip_processor is None:
+            with self._backend_lock:
+                if self._clip_processor is None:
+                    self._clip_processor = CLIPProcessor()
+        return self._clip_processor
+
+    @property
+    def qdrant_manager(self) -> QdrantManager:
+        """Qdrant manager, creating the collections on first access."""
+        if self._qdrant_manager is None:
+            with self._backend_lock:
+                if self._qdrant_manager is None:
+                    qdrant_manager = QdrantManager()
+
+                    # Initialize Qdrant collections
+                    success, message = qdrant_manager.create_collections()
+                    if not success:
+                        print(f"Warning: {message}")
+                    self._qdrant_manager = qdrant_manager
+        return self._qdrant_manager
+
+    def warm_up(self) -> None:
+        """Create all backends now instead of on the first request."""
+        self.ollama_client
+        self.clip_processor
+        self.qdrant_manager
+
     def check_system_status(self) -> Dict[str, Any]:
         """Check status of all system components."""
         status = {"timestamp": datetime.now().isoformat(), "components": {}}
@@ -53,17 +109,51 @@ class ImageProcessor:
         # Check Qdrant manager
         status["components"]["qdrant"] = self.qdrant_manager.test_connection()
 
-        # Overall status
+        return self._finalize_status(status)
+
+    async def check_system_status_async(self) -> Dict[str, Any]:
+        """Check status of all system components concurrently."""
+        status = {"timestamp": datetime.now().isoformat(), "components": {}}
+
+        # The probes are independent, so wall time is the slowest one
+        ollama, clip, qdrant = await asyncio.gather(
+            asyncio.to_thread(self.ollama_client.test_connection),
+            asyncio.to_thread(self.clip_processor.test_connection),
+            asyncio.to_thread(self.qdrant_manager.test_connection),
+        )
+        status["components"]["ollama"] = ollama
+        status["components"]["clip"] = clip
+        status["components"]["qdrant"] = qdrant
+
+        return self._finalize_status(status)
+
+    def _finalize_status(self, status: Dict[str, Any]) -> Dict[str, Any]:
+        """Derive the overall status from the component statuses."""
         all_ok = all(
             comp.get("status") in ["connected", "loaded"]
             for comp in status["components"].values()
         )
         status["overall_status"] = "healthy" if all_ok else "issues_detected"
 
+        # Collection counts, so the UI does not need to scan for them
+        qdrant = status["components"].get("qdrant")
+        if qdrant and qdrant.get("status") == "connected":
+            model_info = qdrant.get("model_info", {})
+            total_collections = len(model_info.get("distance_metrics", []))
+            qdrant["total_collections"] = total_collections
+            qdrant["active_collections"] = (
+                total_collections if model_info.get("collections_created") else 0
+            )
+
         return status
 
     def process_single_image(
-        self, image_path: str, force_reprocess: bool = False
+        self,
+        image_path: str,
+        force_reprocess: bool = False,
+        clip_features: Optional[Dict[str, Any]] = None,
+        store: bool = True,
+        processing_timestamp: Optional[str] = None,
     ) -> Tuple[Dict[str, Any], Optional[str]]:
         """
         Process a single image through all steps.
@@ -71,6 +161,9 @@ class ImageProcessor:
         Args:
             image_path: Path to the image file
             force_reprocess: Whether to force reprocessing even if already processed
+            clip_features: Precomputed CLIP features, e.g. from a batched pass
+            store: Upsert to Qdrant here; False leaves it to the caller
+            processing_timestamp: ISO timestamp shared by a batch, now if None
 
         Returns:
             Tuple of (result, error_message)
@@ -80,27 +173,63 @@ class ImageProcessor:
             if not validate_file_path(image_path):
                 return {"error": "File path not allowed"}, "File path not allowed"
 
-            # Check if file exists
-            if not os.path.exists(image_path):
+            # Check if file exists, the stat result also gives the size
+            try:
+                st = os.stat(image_path)
+            except FileNotFoundError:
+                st = None
+            if st is None or not stat.S_ISREG(st.st_mode):
                 return {"error": "File not found"}, f"File not found: {image_path}"
+            if st.st_size > Config.MAX_IMAGE_BYTES:
+                return {
+                    "error": "File too large"
+                }, f"File too large: {image_path} ({st.st_size} bytes)"
 
             # Check if image is supported
-            if not image_path.lower().endswith(tuple(Config.SUPPORTED_EXTENSIONS)):
+            if not is_image_file(image_path):
                 return {
                     "error": "Unsupported image format"
                 }, f"Unsupported format: {image_path}"
 
-            # Get image metadata
+            # Skip the AI work for images that are already stored
+            content_hash = compute_content_hash(image_path)
+            if not force_reprocess:
+                stored, lookup_error = self.qdrant_manager.find_by_content_hash(
+                    content_hash
+                )
+                if lookup_error:
+                    print(f"Warning: {lookup_error}")
+                elif stored:
+                    return {
+                        "success": True,
+                        "skipped": True,
+                        "image_data": stored,
+                        "message": f"Already processed {os.path.basename(image_path)}",
+                    }, None
+
+            # Get image metadata and EXIF from one open of the file
             try:
                 with Image.open(image_path) as img:
                     width, height = img.size
-                    file_size = os.path.getsize(image_path)
+                    file_size = st.st_size
                     format_name = img.format
+                    # Parsed once for the GPS lookup and the metadata write-back
+                    exif_dict = load_exif_dict(img)
+                    # Decode once, downsized for the AI analysis upload
+                    upload_image = OllamaClient.downsize_for_upload(img)
             except Exception as e:
                 return {"error": "Failed to read image"}, f"Image read error: {e}"
 
+            # Start the image embedding unless it was computed in a batch already,
+            # it does not depend on the geocoding and AI analysis below
+            clip_future = None
+            if clip_features is None:
+                clip_future = self._clip_executor.submit(
+                    self.clip_processor.get_image_features, image_path, content_hash
+                )
+
             # Extract GPS coordinates
-            gps_coords = get_gps_coordinates(image_path)
+            gps_coords = get_gps_coordinates_from_exif(exif_dict)
             location_name = None
             if gps_coords:
                 lat, lon = gps_coords
@@ -109,7 +238,7 @@ class ImageProcessor:
             # Generate AI tags and description
             print(f"DEBUG: Starting AI analysis for image: {image_path}")
             ai_analysis, ai_error = self.ollama_client.generate_image_analysis(
-                image_path
+                image_path, image=upload_image
             )
             if ai_error:
                 print(f"DEBUG: AI analysis failed: {ai_error}")
@@ -117,12 +246,11 @@ class ImageProcessor:
             print(f"DEBUG: AI analysis completed successfully")
             print(f"DEBUG: AI analysis result: {ai_analysis}")
 
-            # Get image embedding
-            clip_features, clip_error = self.clip_processor.get_image_features(
-                image_path
-            )
-            if clip_error:
-                return {"error": "CLIP processing failed"}, clip_error
+            # Collect the image embedding started above
+            if clip_future is not None:
+                clip_features, clip_error = clip_future.result()
+                if clip_error:
+                    return {"error": "CLIP processing failed"}, clip_error
 
             # Prepare image data for Qdrant
             image_data = {
@@ -130,26 +258,22 @@ class ImageProcessor:
                 "file_path": os.path.abspath(image_path),
                 "file_name": os.path.basename(image_path),
                 "file_size": file_size,
+                "content_hash": content_hash,
                 "width": width,
                 "height": height,
                 "format": format_name,
-                "processing_timestamp": datetime.now().isoformat(),
+                "processing_timestamp": processing_timestamp
+                or datetime.now().isoformat(),
                 "gps_coordinates": gps_coords,
                 "location_name": location_name,
                 "ai_tags": ai_analysis.get("tags", []),
+                "ai_tags_lc": [tag.lower() for tag in ai_analysis.get("tags", [])],
                 "ai_description": ai_analysis.get("description", ""),
                 "model_used": ai_analysis.get("model_used", "unknown"),
                 "embedding": clip_features.get("embedding", []),
                 "embedding_dim": clip_features.get("embedding_dim", 0),
             }
 
-            # Upsert to Qdrant
-            success, error = self.qdrant_manager.upsert_image(
-                image_data, image_data["embedding"]
-            )
-            if error:
-                return {"error": "Database storage failed"}, error
-
             # Add metadata to image file
             try:
                 metadata_to_add = {
@@ -162,10 +286,35 @@ class ImageProcessor:
                     metadata_to_add["GPS Latitude"] = str(gps_coords[0])
                     metadata_to_add["GPS Longitude"] = str(gps_coords[1])
 
-                extract_and_add_metadata(image_path, metadata_to_add)
+                _, write_success, _ = extract_and_add_metadata(
+                    image_path,
+                    metadata_to_add,
+                    exif_dict=exif_dict,
+                    img_format=format_name,
+                )
+                # Store the hash of the rewritten file so re-runs match it
+                if write_success:
+                    image_data["content_hash"] = compute_content_hash(image_path)
             except Exception as e:
                 print(f"Warning: Failed to add metadata to image: {e}")
 
+            # Keyed by the final file, so query searches with it skip the model
+            if len(image_data["embedding"]):
+                self.clip_processor.cache_embedding(
+                    image_data["content_hash"], image_data["embedding"]
+                )
+
+            # Upsert to Qdrant
+            if store:
+                success, error = self.qdrant_manager.upsert_image(
+                    image_data, image_data["embedding"]
+                )
+                if error:
+                    return {"error": "Database storage failed"}, error
+
+                # Cached search results may now be missing this image
+                self.clear_query_cache()
+
             # Return success result
             result = {
                 "success": True,
@@ -178,6 +327,170 @@ class ImageProcessor:
         except Exception as e:
             return {"error": "Processing failed"}, f"Error processing image: {e}"
 
+    def find_bulk_images(
+        self, directory_path: str, max_images: int = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Validate a directory and collect the image files to process.
+
+        Args:
+            directory_path: Path to directory containing images
+            max_images: Maximum number of images to process
+
+        Returns:
+            Tuple of (image_paths, error_message)
+        """
+        # Validate directory path
+        if not validate_file_path(directory_path):
+            return [], "Directory path not allowed"
+
+        try:
+            is_dir = stat.S_ISDIR(os.stat(directory_path).st_mode)
+        except OSError:
+            is_dir = False
+        if not is_dir:
+            return [], f"Directory not found: {directory_path}"
+
+        # Find image files, stopping the scan once the limit is reached
+        image_files = list(islice(iter_image_files(directory_path), max_images or None))
+
+        if not image_files:
+            return [], "No supported image files found in directory"
+
+        return image_files, None
+
+    def process_bulk_images_iter(
+        self, image_files: List[str]
+    ) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        """
+        Process images, yielding after each image.
+
+        CLIP embeddings are computed for Config.BATCH_SIZE images per forward
+        pass; the per-image steps (EXIF, AI analysis, storage) of a batch run
+        on Config.BULK_WORKERS threads so their network waits overlap.
+
+        Args:
+            image_files: Paths of the images to process
+
+        Yields:
+            Tuple of (processed_count, total_count, image_result)
+        """
+        total = len(image_files)
+        batch_size = max(1, Config.BATCH_SIZE)
+        # The next batch is decoded while this one goes through AI analysis
+        batches = self.clip_processor.iter_image_features_batches(
+            image_files, batch_size
+        )
+        processed = 0
+        with ThreadPoolExecutor(max_workers=max(1, Config.BULK_WORKERS)) as executor:
+            for start, batch_features in zip(range(0, total, batch_size), batches):
+                chunk = image_files[start : start + batch_size]
+                for offset, image_path in enumerate(chunk):
+                    print(
+                        f"Processing image {start + offset + 1}/{total}: "
+                        f"{os.path.basename(image_path)}"
+                    )
+
+                # Results come back in input order, one timestamp per batch
+                image_results = list(
+                    executor.map(
+                        self._process_bulk_image,
+                        chunk,
+                        batch_features,
+                        repeat(datetime.now().isoformat()),
+                    )
+                )
+                # Only the last flush waits for Qdrant to apply the batch
+                self._store_bulk_batch(image_results, wait=start + batch_size >= total)
+                for image_result in image_results:
+                    processed += 1
+                    yield processed, total, image_result
+
+    def _store_bulk_batch(
+        self, image_results: List[Dict[str, Any]], wait: bool
+    ) -> None:
+        """
+        Upsert the successful images of a bulk batch with one request.
+
+        Args:
+            image_results: Per-image results, updated in place
+            wait: Whether to wait until Qdrant has applied the points
+        """
+        stored = [
+            r
+            for r in image_results
+            if r["status"] == "success" and not r.get("skipped")
+        ]
+        if not stored:
+            return
+
+        items = [(r["data"], r.pop("embedding")) for r in stored]
+        success, error = self.qdrant_manager.upsert_images_batch(items, wait=wait)
+        if error:
+            for image_result in stored:
+                image_result["status"] = "failed"
+                image_result["error"] = error
+                image_result.pop("data", None)
+            return
+
+        # Cached search results may now be missing these images
+        self.clear_query_cache()
+
+    def _process_bulk_image(
+        self,
+        image_path: str,
+        batch_features: Tuple[Dict[str, Any], Optional[str]],
+        processing_timestamp: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process one image of a bulk run with its precomputed CLIP features.
+
+        Args:
+            image_path: Path to the image file
+            batch_features: (features, error_message) from the batched CLIP pass
+            processing_timestamp: ISO timestamp shared by the batch
+
+        Returns:
+            The per-image result entry
+        """
+        features, clip_error = batch_features
+        try:
+            # On a batch failure let the single image path report the error
+            result, error = self.process_single_image(
+                image_path,
+                clip_features=None if clip_error else features,
+                store=False,
+                processing_timestamp=processing_timestamp,
+            )
+            if error:
+                return {
+                    "image_path": image_path,
+                    "status": "failed",
+                    "error": error,
+                }
+
+            # The vector is only kept until the batch upsert takes it
+            image_data = result.get("image_data", {})
+            if result.get("skipped"):
+                return {
+                    "image_path": image_path,
+                    "status": "success",
+                    "skipped": True,
+                    "data": image_data,
+                }
+            return {
+                "image_path": image_path,
+                "status": "success",
+                "data": {k: v for k, v in image_data.items() if k != "embedding"},
+                "embedding": image_data.get("embedding", []),
+            }
+        except Exception as e:
+            return {
+                "image_path": image_path,
+                "status": "failed",
+                "error": str(e),
+            }
+
     def process_bulk_images(
         self, directory_path: str, max_images: int = None
     ) -> Tuple[Dict[str, Any], Optional[str]]:
@@ -192,34 +505,9 @@ class ImageProcessor:
             Tuple of (result, error_message)
         """
         try:
-            # Validate directory path
-            if not validate_file_path(directory_path):
-                return {
-                    "error": "Directory path not allowed"
-                }, "Directory path not allowed"
-
-            if not os.path.isdir(directory_path):
-                return {
-                    "error": "Directory not found"
-                }, f"Directory not found: {directory_path}"
-
-            # Find image files
-            image_files = []
-            for root, dirs, files in os.walk(directory_path):
-                for file in files:
-                    if file.lower().endswith(tuple(Config.SUPPORTED_EXTENSIONS)):
-                        image_path = os.path.join(root, file)
-                        image_files.append(image_path)
-
-                # Limit number of images
-                if max_images and len(image_files) >= max_images:
-                    image_files = image_files[:max_images]
-                    break
-
-            if not image_files:
-                return {
-                    "error": "No images found"
-                }, "No supported image files found in directory"
+            image_files, error = self.find_bulk_images(directory_path, max_images)
+            if error:
+                return {"error": error}, error
 
             # Process images
             results = {
@@ -231,36 +519,12 @@ class ImageProcessor:
                 "end_time": None,
             }
 
-            for i, image_path in enumerate(image_files):
-                print(
-                    f"Processing image {i + 1}/{len(image_files)}: {os.path.basename(image_path)}"
-                )
-
-                try:
-                    result, error = self.process_single_image(image_path)
-                    if error:
-                        results["failed"] += 1
-                        results["results"].append(
-                            {
-                                "image_path": image_path,
-                                "status": "failed",
-                                "error": error,
-                            }
-                        )
-                    else:
-                        results["processed"] += 1
-                        results["results"].append(
-                            {
-                                "image_path": image_path,
-                                "status": "success",
-                                "data": result.get("image_data", {}),
-                            }
-                        )
-                except Exception as e:
+            for _, _, image_result in self.process_bulk_images_iter(image_files):
+                if image_result["status"] == "success":
+                    results["processed"] += 1
+                else:
                     results["failed"] += 1
-                    results["results"].append(
-                        {"image_path": image_path, "status": "failed", "error": str(e)}
-                    )
+                results["results"].append(image_result)
 
             results["end_time"] = datetime.now().isoformat()
 
@@ -298,12 +562,13 @@ class ImageProcessor:
                         "error": "Query image not found"
                     }, f"Query image not found: {query_image_path}"
 
-                clip_features, clip_error = self.clip_processor.get_image_features(
+                # Only the embedding is needed, skip the features metadata
+                embedding, clip_error = self.clip_processor.get_image_embedding(
                     query_image_path
                 )
                 if clip_error:
                     return {"error": "Failed to process query image"}, clip_error
-                query_embedding = clip_features.get("embedding", [])
+                query_embedding = embedding.tolist()
 
                 # Use vector search for image similarity
                 distance_metric = (
@@ -316,6 +581,7 @@ class ImageProcessor:
                     limit=limit,
                     distance_metric=distance_metric,
                     score_threshold=0.6,
+                    tags=tags,
                 )
 
                 if error:
@@ -325,13 +591,27 @@ class ImageProcessor:
 
             # Use metadata search for text queries
             elif text_query or tags:
-                # Use metadata search instead of vector search for text
-                results, error = self.qdrant_manager.search_metadata(
-                    text_query=text_query, tags=tags, limit=limit, score_threshold=0.6
+                # Repeated queries reuse the results of an earlier search
+                cache_key = (
+                    " ".join((text_query or "").split()),
+                    tuple(tags or ()),
+                    limit,
                 )
+                results = self._lookup_query_cache(cache_key)
+
+                if results is None:
+                    # Use metadata search instead of vector search for text
+                    results, error = self.qdrant_manager.search_metadata(
+                        text_query=text_query,
+                        tags=tags,
+                        limit=limit,
+                        score_threshold=0.6,
+                    )
 
-                if error:
-                    return {"error": "Metadata search failed"}, error
+                    if error:
+                        return {"error": "Metadata search failed"}, error
+
+                    self._store_query_cache(cache_key, results)
 
                 query_type = "text"
 
@@ -347,6 +627,7 @@ class ImageProcessor:
                     limit=limit,
                     distance_metric=distance_metric,
                     score_threshold=0.6,
+                    tags=tags,
                 )
 
                 if error:
@@ -359,21 +640,6 @@ class ImageProcessor:
                     "error": "No query provided"
                 }, "Please provide either text query, embedding, or query image path"
 
-            # Filter by tags if provided (additional filtering)
-            if tags:
-                filtered_results = []
-                for result in results:
-                    payload = result.get("payload", {})
-                    result_tags = payload.get("ai_tags", [])
-
-                    # Check if any of the requested tags are present
-                    if any(
-                        tag.lower() in [t.lower() for t in result_tags] for tag in tags
-                    ):
-                        filtered_results.append(result)
-
-                results = filtered_results
-
             return {
                 "query": query_type,
                 "results": results,
@@ -384,6 +650,35 @@ class ImageProcessor:
         except Exception as e:
             return {"error": "Search failed"}, f"Error in search: {e}"
 
+    def _lookup_query_cache(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find cached results of an identical earlier query.
+
+        Args:
+            key: Whitespace-normalized text query, tags and limit
+
+        Returns:
+            The cached results, or None on a miss
+        """
+        with self._query_cache_lock:
+            results = self._query_cache.get(key)
+            if results is not None:
+                self._query_cache.move_to_end(key)
+            return results
+
+    def _store_query_cache(self, key: Tuple, results: List[Dict[str, Any]]) -> None:
+        """Remember the results of a query, evicting the oldest entry when full."""
+        with self._query_cache_lock:
+            self._query_cache[key] = results
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > Config.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+    def clear_query_cache(self) -> None:
+        """Forget cached search results, e.g. after the index changed."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+
     def get_image_by_path(
         self, image_path: str
     ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
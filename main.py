@@ -5,17 +5,22 @@ Main entry point for the Qdrant Hackathon application.
 import sys
 import os
 import argparse
+import logging
+from functools import lru_cache
 from typing import Optional
 
 # Add the current directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import demo
 from config import Config
 
 
-def main():
-    """Main entry point for the application."""
+@lru_cache(maxsize=1)
+def get_args() -> argparse.Namespace:
+    """Parse the command line once per process; defaults come from Config."""
+    # Environment first, so command line arguments take precedence
+    Config.update_from_env()
+
     parser = argparse.ArgumentParser(
         description="Qdrant Hackathon - Image Search & Processing"
     )
@@ -60,9 +65,26 @@ def main():
         default=Config.QDRANT_PORT,
         help=f"Qdrant port (default: {Config.QDRANT_PORT})",
     )
+    parser.add_argument(
+        "--eager-init",
+        action="store_true",
+        default=Config.EAGER_INIT,
+        help="Load the models at startup instead of on the first request",
+    )
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
 
-    args = parser.parse_args()
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point for the application."""
+    args = get_args()
+
+    # Module loggers such as the Ollama client's only emit debug output here
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else Config.LOG_LEVEL,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
 
     # Update configuration with command line arguments
     Config.SERVER_NAME = args.host
@@ -76,6 +98,7 @@ def main():
     Config.OLLAMA_MODEL = args.ollama_model
     Config.QDRANT_HOST = args.qdrant_host
     Config.QDRANT_PORT = args.qdrant_port
+    Config.EAGER_INIT = args.eager_init
 
     if args.debug:
         print("=== Qdrant Hackathon Configuration ===")
@@ -88,6 +111,16 @@ def main():
         print("=====================================")
 
     print("Starting Qdrant Hackathon application...")
+
+    # Gradio, Qdrant and the model stack load here, after --help has exited,
+    # and the UI is built with the final configuration
+    from app import demo, initialize_processor
+
+    if Config.EAGER_INIT:
+        # Hide the model load behind startup instead of the first request
+        print("Initializing image processor...")
+        initialize_processor().warm_up()
+
     print(f"Access the interface at: http://{Config.SERVER_NAME}:{Config.SERVER_PORT}")
 
     try:
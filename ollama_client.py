@@ -2,17 +2,138 @@
 Ollama client for image tagging and description generation using OpenAI compatibility.
 """
 
-import json
+import importlib.util
+import io
+import logging
 import os
-import base64
+import binascii
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from openai import OpenAI
+from PIL import Image
+
+try:
+    # Optional, decodes model responses several times faster than json
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 from config import Config
-from utils import _sanitize_for_json
+
+logger = logging.getLogger(__name__)
+
+# Encoded upload images kept for repeated analyses of unchanged files
+ENCODED_IMAGE_CACHE_SIZE = 64
+
+# Prompts are built once, only the tag count is filled in per call
+_TAGS_PROMPT_TMPL = """
+Analysiere das bereitgestellte Bild und generiere beschreibende Tags.
+Erstelle genau {max_tags} Tags, die den Bildinhalt beschreiben.
+Formatiere die Antwort als JSON-Objekt mit dem Feld "tags".
+Gib die Tags auf Deutsch aus.
+Beispiel: {{"tags": ["strand", "sonnenuntergang", "ozean", "himmel", "sand", "wellen", "tropisch", "landschaft", "natur", "draußen"]}}
+""".strip()
+
+_DESCRIPTION_PROMPT = """
+Analysiere das bereitgestellte Bild und gib eine detaillierte Beschreibung.
+Beschreibe die Hauptmotive, die Umgebung, Farben, Stimmung und alle bemerkenswerten Merkmale.
+Schreibe einen zusammenhängenden Absatz von 3-5 Sätzen auf Deutsch.
+""".strip()
+
+_COMBINED_PROMPT_TMPL = """
+Analysiere das bereitgestellte Bild.
+Erstelle genau {max_tags} beschreibende Tags auf Deutsch und eine detaillierte Beschreibung.
+Beschreibe die Hauptmotive, die Umgebung, Farben, Stimmung und alle bemerkenswerten Merkmale in einem zusammenhängenden Absatz von 3-5 Sätzen auf Deutsch.
+Antworte ausschließlich mit einem JSON-Objekt der Form:
+{{"tags": ["strand", "sonnenuntergang", "ozean"], "description": "..."}}
+""".strip()
+
+_TAGS_BATCH_PROMPT_TMPL = """
+Analysiere jedes der folgenden {count} Bilder in der gegebenen Reihenfolge.
+Erstelle für jedes Bild genau {max_tags} Tags auf Deutsch, die den Bildinhalt beschreiben.
+Antworte ausschließlich mit einem JSON-Objekt, im Feld "tags" ein Array pro Bild:
+{{"tags": [["tag1_bild1", "tag2_bild1"], ["tag1_bild2", "tag2_bild2"]]}}
+""".strip()
+
+# Seconds a model or connection probe is served before it is refreshed
+MODEL_CACHE_TTL = 60.0
+
+# Images per multi-image request, more risks overflowing the model context
+TAG_BATCH_MAX_IMAGES = 4
+
+# Structured output schemas, enforced by the server while decoding
+_TAGS_SCHEMA = {
+    "name": "tags",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 20}
+        },
+        "required": ["tags"],
+    },
+}
+
+_COMBINED_SCHEMA = {
+    "name": "image_analysis",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 20},
+            "description": {"type": "string"},
+        },
+        "required": ["tags", "description"],
+    },
+}
+
+
+def _tags_batch_schema(count: int) -> Dict[str, Any]:
+    """Build the structured output schema for tags of count images."""
+    return {
+        "name": "tags_batch",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "tags": {
+                    "type": "array",
+                    "items": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "maxItems": 20,
+                    },
+                    "minItems": count,
+                    "maxItems": count,
+                }
+            },
+            "required": ["tags"],
+        },
+    }
+
+
+def _image_part(image_base64: str) -> Dict[str, Any]:
+    """Build the image_url content part for an encoded upload JPEG."""
+    return {
+        "type": "image_url",
+        "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"},
+    }
+
+
+def _image_message(prompt: str, image_base64: str) -> Dict[str, Any]:
+    """Build a user message with a prompt and one image."""
+    # A literal is cheaper than deep-copying a shared template
+    return {
+        "role": "user",
+        "content": [{"type": "text", "text": prompt}, _image_part(image_base64)],
+    }
+
+
+@lru_cache(maxsize=ENCODED_IMAGE_CACHE_SIZE)
+def _encode_image(image_path: str, mtime_ns: int, size: int) -> str:
+    """Encode a file for upload; mtime and size invalidate the cache entry."""
+    return OllamaClient.encode_image(OllamaClient.load_upload_image(image_path))
 
 
 class OllamaClient:
@@ -20,15 +141,116 @@ class OllamaClient:
 
     def __init__(self):
         """Initialize the Ollama client."""
-        self.client = OpenAI(
-            base_url=Config.OLLAMA_BASE_URL,
-            api_key=Config.OLLAMA_API_KEY,
-        )
+        # The OpenAI client and its transport are built on first use
+        self._client = None
+        self._http = None
+        self._client_lock = threading.Lock()
         self.model_name = Config.OLLAMA_MODEL
         self.model_info = Config.get_ollama_model_info()
 
+        # Description requests of concurrent analyses, one per bulk worker
+        self._request_executor = ThreadPoolExecutor(
+            max_workers=max(1, Config.BULK_WORKERS)
+        )
+
+        # Probe results as key -> (monotonic time, value), see _cached_probe
+        self._probe_cache: Dict[str, tuple] = {}
+        self._probe_refreshing = set()
+        self._probe_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """OpenAI-compatible client, created on first access."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    # The SDK pulls in pydantic, httpx and anyio, import it only
+                    # when a request is made
+                    import httpx
+                    from openai import OpenAI
+
+                    # One pooled transport keeps connections to Ollama alive
+                    # between calls; HTTP/2 needs the optional h2 package and
+                    # a TLS endpoint
+                    self._http = httpx.Client(
+                        http2=importlib.util.find_spec("h2") is not None,
+                        timeout=httpx.Timeout(Config.OLLAMA_TIMEOUT, connect=10.0),
+                        limits=httpx.Limits(
+                            max_keepalive_connections=16,
+                            max_connections=32,
+                            keepalive_expiry=300,
+                        ),
+                    )
+                    self._client = OpenAI(
+                        base_url=Config.OLLAMA_BASE_URL,
+                        api_key=Config.OLLAMA_API_KEY,
+                        http_client=self._http,
+                    )
+        return self._client
+
+    def close(self) -> None:
+        """Close the pooled connections and the request threads."""
+        self._request_executor.shutdown(wait=False)
+        if self._http is not None:
+            self._http.close()
+
+    def _cached_probe(self, key: str, compute, is_ok) -> Any:
+        """
+        Serve a probe result for MODEL_CACHE_TTL, then stale while refreshing.
+
+        Args:
+            key: Cache key of the probe
+            compute: Performs the request and returns its result
+            is_ok: Tells whether a result may be cached, failures never are
+
+        Returns:
+            The cached or freshly computed result
+        """
+        with self._probe_lock:
+            entry = self._probe_cache.get(key)
+            if entry is not None:
+                timestamp, value = entry
+                stale = time.monotonic() - timestamp >= MODEL_CACHE_TTL
+                if stale and key not in self._probe_refreshing:
+                    # One background refresh per key, callers keep the old value
+                    self._probe_refreshing.add(key)
+                    threading.Thread(
+                        target=self._refresh_probe,
+                        args=(key, compute, is_ok),
+                        daemon=True,
+                    ).start()
+                return value
+
+        value = compute()
+        if is_ok(value):
+            with self._probe_lock:
+                self._probe_cache[key] = (time.monotonic(), value)
+        return value
+
+    def _refresh_probe(self, key: str, compute, is_ok) -> None:
+        """Recompute a stale probe result, dropping it if the probe now fails."""
+        try:
+            value = compute()
+            with self._probe_lock:
+                if is_ok(value):
+                    self._probe_cache[key] = (time.monotonic(), value)
+                else:
+                    self._probe_cache.pop(key, None)
+        except Exception:
+            with self._probe_lock:
+                self._probe_cache.pop(key, None)
+        finally:
+            with self._probe_lock:
+                self._probe_refreshing.discard(key)
+
     def check_connection(self) -> tuple[bool, Optional[str]]:
         """Check connection to Ollama server."""
+        return self._cached_probe(
+            "check_connection", self._check_connection, lambda result: result[0]
+        )
+
+    def _check_connection(self) -> tuple[bool, Optional[str]]:
+        """Check connection to Ollama server with a request."""
         try:
             # Try to list models to check connection
             models = self.client.models.list()
@@ -36,8 +258,112 @@ class OllamaClient:
         except Exception as e:
             return False, f"Connection failed: {e}"
 
+    @staticmethod
+    def downsize_for_upload(img: Image.Image) -> Image.Image:
+        """Decode an opened image as RGB within Config.MAX_IMAGE_SIZE."""
+        max_size = Config.MAX_IMAGE_SIZE
+        # JPEGs are DCT-scaled while decoding, the rest is resized below
+        img.draft("RGB", (max_size, max_size))
+        image = img.convert("RGB")
+        image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        return image
+
+    @classmethod
+    def load_upload_image(cls, image_path: str) -> Image.Image:
+        """Load an image downsized for upload."""
+        with Image.open(image_path) as img:
+            return cls.downsize_for_upload(img)
+
+    @staticmethod
+    def encode_image(image: Image.Image) -> str:
+        """JPEG-encode an image in memory and return it as base64."""
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85)
+        # Encode straight from the buffer's memory instead of a bytes copy
+        return binascii.b2a_base64(buffer.getbuffer(), newline=False).decode("ascii")
+
+    def encode_image_path(self, image_path: str) -> str:
+        """Get the base64 upload image for a file, reusing earlier encodings."""
+        st = os.stat(image_path)
+        return _encode_image(image_path, st.st_mtime_ns, st.st_size)
+
+    def _encode_checked(self, image_path: str) -> tuple[Optional[str], Optional[str]]:
+        """Encode a file for upload, reporting a missing file as an error."""
+        # One stat gives existence, size and the cache key
+        try:
+            st = os.stat(image_path)
+        except FileNotFoundError:
+            return None, f"Image file not found: {image_path}"
+        logger.debug("Image file size: %d bytes", st.st_size)
+        if st.st_size > Config.MAX_IMAGE_BYTES:
+            return None, f"Image file too large: {image_path} ({st.st_size} bytes)"
+        return _encode_image(image_path, st.st_mtime_ns, st.st_size), None
+
+    @staticmethod
+    def _clean_tag_list(tags: List[Any], max_tags: int) -> List[str]:
+        """Clean, lowercase and limit a tag list parsed from a model response."""
+        clean_tags = []
+        for tag in tags:
+            if isinstance(tag, str) and tag.strip():
+                clean_tag = tag.strip().lower()
+                if len(clean_tag) > 1:  # Filter out very short tags
+                    clean_tags.append(clean_tag)
+            elif isinstance(tag, list):
+                # Handle nested arrays (sometimes AI returns arrays of arrays)
+                for sub_tag in tag:
+                    if isinstance(sub_tag, str) and sub_tag.strip():
+                        clean_sub_tag = sub_tag.strip().lower()
+                        if len(clean_sub_tag) > 1:
+                            clean_tags.append(clean_sub_tag)
+
+        # Limit to max_tags
+        return clean_tags[:max_tags]
+
+    def _generate_combined(
+        self, image_base64: str, max_tags: int = 10
+    ) -> tuple[Dict[str, Any], Optional[str]]:
+        """
+        Generate tags and description with a single request.
+
+        Args:
+            image_base64: Encoded upload image
+            max_tags: Maximum number of tags to generate
+
+        Returns:
+            Tuple of ({"tags": ..., "description": ...}, error_message)
+        """
+        try:
+            prompt = _COMBINED_PROMPT_TMPL.format(max_tags=max_tags)
+
+            message = _image_message(prompt, image_base64)
+
+            response = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[message],
+                max_tokens=800,
+                temperature=0.5,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": _COMBINED_SCHEMA,
+                },
+            )
+
+            # Schema-constrained output needs no fence stripping or type checks
+            parsed = json_loads(response.choices[0].message.content)
+            tags = parsed["tags"]
+            description = parsed["description"]
+
+            clean_tags = self._clean_tag_list(tags, max_tags)
+            if not clean_tags or not description.strip():
+                return {}, "Combined response has empty tags or description"
+
+            return {"tags": clean_tags, "description": description.strip()}, None
+
+        except Exception as e:
+            return {}, f"Error generating combined analysis: {e}"
+
     def generate_tags(
-        self, image_path: str, max_tags: int = 10
+        self, image_path: str, max_tags: int = 10, image_base64: Optional[str] = None
     ) -> tuple[List[str], Optional[str]]:
         """
         Generate tags for an image using Ollama.
@@ -45,167 +371,166 @@ class OllamaClient:
         Args:
             image_path: Path to the image file
             max_tags: Maximum number of tags to generate
+            image_base64: Already encoded upload image, read from image_path if None
 
         Returns:
             Tuple of (tags, error_message)
         """
         try:
             # DEBUG: Log the image path and check if file exists
-            print(f"DEBUG: Attempting to process image at path: {image_path}")
-            print(f"DEBUG: File exists: {os.path.exists(image_path)}")
+            logger.debug("Generating tags for image: %s", image_path)
 
-            if not os.path.exists(image_path):
-                return [], f"Image file not found: {image_path}"
+            if image_base64 is None:
+                image_base64, error = self._encode_checked(image_path)
+                if error:
+                    return [], error
+            base64_image = image_base64
 
-            # Check file size
-            file_size = os.path.getsize(image_path)
-            print(f"DEBUG: Image file size: {file_size} bytes")
+            logger.debug("Image encoded to base64, length: %d", len(base64_image))
 
-            # Read and encode image as base64
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode("utf-8")
+            # Create a prompt for image tagging
+            prompt = _TAGS_PROMPT_TMPL.format(max_tags=max_tags)
 
-            print(
-                f"DEBUG: Image encoded to base64, length: {len(base64_image)} characters"
-            )
+            logger.debug("Sending image and tag prompt to model: %s", self.model_name)
 
-            # Create a prompt for image tagging
-            prompt = f"""
-            Analysiere das bereitgestellte Bild und generiere beschreibende Tags.
-            Erstelle genau {max_tags} Tags, die den Bildinhalt beschreiben.
-            Formatiere die Antwort als JSON-Array von Strings.
-            Gib die Tags auf Deutsch aus.
-            Beispiel: ["strand", "sonnenuntergang", "ozean", "himmel", "sand", "wellen", "tropisch", "landschaft", "natur", "draußen"]
-            """
-
-            print(f"DEBUG: Sending image and prompt to model: {self.model_name}")
-            print(f"DEBUG: Prompt length: {len(prompt)} characters")
-
-            # Create message with image content
-            message = {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"},
-                    },
-                ],
-            }
+            message = _image_message(prompt, base64_image)
 
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[message],
                 max_tokens=500,
                 temperature=0.3,
+                response_format={"type": "json_schema", "json_schema": _TAGS_SCHEMA},
             )
 
-            print(f"DEBUG: API call successful, response received")
-
-            # Extract and parse the response
-            content = response.choices[0].message.content.strip()
-
-            try:
-                # Clean up malformed JSON responses
-                clean_content = content
-                # Remove markdown code block markers
-                if clean_content.startswith("```json"):
-                    clean_content = clean_content[7:]  # Remove ```json
-                if clean_content.startswith("```"):
-                    clean_content = clean_content[3:]  # Remove ```
-                if clean_content.endswith("```"):
-                    clean_content = clean_content[:-3]  # Remove trailing ```
-                
-                # Try to parse as JSON first
-                tags = json.loads(clean_content)
-                if isinstance(tags, list):
-                    # Clean and filter tags
-                    clean_tags = []
-                    for tag in tags:
-                        if isinstance(tag, str) and tag.strip():
-                            clean_tag = tag.strip().lower()
-                            if len(clean_tag) > 1:  # Filter out very short tags
-                                clean_tags.append(clean_tag)
-                        elif isinstance(tag, list):
-                            # Handle nested arrays (sometimes AI returns arrays of arrays)
-                            for sub_tag in tag:
-                                if isinstance(sub_tag, str) and sub_tag.strip():
-                                    clean_sub_tag = sub_tag.strip().lower()
-                                    if len(clean_sub_tag) > 1:
-                                        clean_tags.append(clean_sub_tag)
-
-                    # Limit to max_tags
-                    return clean_tags[:max_tags], None
-            except json.JSONDecodeError:
-                # If not JSON, try to extract tags from text
-                lines = content.split("\n")
-                tags = []
-                for line in lines:
-                    line = line.strip().strip("-").strip("*").strip()
-                    if line and "," in line:
-                        # Split by comma
-                        sub_tags = [
-                            tag.strip().lower()
-                            for tag in line.split(",")
-                            if tag.strip()
-                        ]
-                        tags.extend(sub_tags)
-                    elif line:
-                        # Add single tag
-                        tags.append(line.lower())
-
-                # Clean and limit tags
-                clean_tags = [tag for tag in tags if len(tag) > 1]
-                return clean_tags[:max_tags], None
-
-            return [], "Failed to parse tags from response"
+            logger.debug("Tag API call successful")
+
+            # The schema makes the decoder emit {"tags": [...]}, one parse suffices
+            parsed = json_loads(response.choices[0].message.content)
+            return self._clean_tag_list(parsed["tags"], max_tags), None
 
         except Exception as e:
             return [], f"Error generating tags: {e}"
 
-    def generate_description(self, image_path: str) -> tuple[str, Optional[str]]:
+    def generate_tags_batch(
+        self, image_paths: List[str], max_tags: int = 10
+    ) -> List[tuple[List[str], Optional[str]]]:
+        """
+        Generate tags for several images, TAG_BATCH_MAX_IMAGES per request.
+
+        A chunk whose request fails is retried image by image, so one bad
+        file or response only costs the images it affects.
+
+        Args:
+            image_paths: Paths to the image files
+            max_tags: Maximum number of tags per image
+
+        Returns:
+            List of (tags, error_message) tuples aligned with image_paths
+        """
+        results = []
+        for start in range(0, len(image_paths), TAG_BATCH_MAX_IMAGES):
+            chunk = image_paths[start : start + TAG_BATCH_MAX_IMAGES]
+            chunk_tags, error = self._generate_tags_chunk(chunk, max_tags)
+            if error:
+                logger.warning(
+                    "Batch tag request failed, tagging %d images one by one: %s",
+                    len(chunk),
+                    error,
+                )
+                results.extend(
+                    self.generate_tags(image_path, max_tags) for image_path in chunk
+                )
+            else:
+                results.extend((tags, None) for tags in chunk_tags)
+
+        return results
+
+    def _generate_tags_chunk(
+        self, image_paths: List[str], max_tags: int
+    ) -> tuple[List[List[str]], Optional[str]]:
+        """
+        Generate tags for up to TAG_BATCH_MAX_IMAGES images with one request.
+
+        Args:
+            image_paths: Paths to the image files
+            max_tags: Maximum number of tags per image
+
+        Returns:
+            Tuple of (tags per image in input order, error_message)
+        """
+        try:
+            content = [
+                {
+                    "type": "text",
+                    "text": _TAGS_BATCH_PROMPT_TMPL.format(
+                        count=len(image_paths), max_tags=max_tags
+                    ),
+                }
+            ]
+            for image_path in image_paths:
+                image_base64, error = self._encode_checked(image_path)
+                if error:
+                    return [], error
+                content.append(_image_part(image_base64))
+
+            logger.debug("Sending %d images in one tag request", len(image_paths))
+            response = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": content}],
+                max_tokens=300 * len(image_paths),
+                temperature=0.3,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": _tags_batch_schema(len(image_paths)),
+                },
+            )
+
+            # The schema fixes the shape, only the count is checked here
+            parsed = json_loads(response.choices[0].message.content)["tags"]
+            if len(parsed) != len(image_paths):
+                return [], "Batch response does not have one tag list per image"
+
+            return [self._clean_tag_list(tags, max_tags) for tags in parsed], None
+
+        except Exception as e:
+            return [], f"Error generating batch tags: {e}"
+
+    def generate_description(
+        self, image_path: str, image_base64: Optional[str] = None
+    ) -> tuple[str, Optional[str]]:
         """
         Generate a description for an image using Ollama.
 
         Args:
             image_path: Path to the image file
+            image_base64: Already encoded upload image, read from image_path if None
 
         Returns:
             Tuple of (description, error_message)
         """
         try:
             # DEBUG: Log the image path for description generation
-            print(f"DEBUG: Generating description for image: {image_path}")
+            logger.debug("Generating description for image: %s", image_path)
 
-            # Read and encode image as base64
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode("utf-8")
+            if image_base64 is None:
+                image_base64, error = self._encode_checked(image_path)
+                if error:
+                    return "", error
+            base64_image = image_base64
 
-            print(
-                f"DEBUG: Image encoded to base64 for description, length: {len(base64_image)} characters"
+            logger.debug(
+                "Image encoded to base64 for description, length: %d",
+                len(base64_image),
             )
 
-            prompt = f"""
-            Analysiere das bereitgestellte Bild und gib eine detaillierte Beschreibung.
-            Beschreibe die Hauptmotive, die Umgebung, Farben, Stimmung und alle bemerkenswerten Merkmale.
-            Schreibe einen zusammenhängenden Absatz von 3-5 Sätzen auf Deutsch.
-            """
+            prompt = _DESCRIPTION_PROMPT
 
-            print(
-                f"DEBUG: Sending image and description prompt to model: {self.model_name}"
+            logger.debug(
+                "Sending image and description prompt to model: %s", self.model_name
             )
 
-            # Create message with image content
-            message = {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"},
-                    },
-                ],
-            }
+            message = _image_message(prompt, base64_image)
 
             response = self.client.chat.completions.create(
                 model=self.model_name,
@@ -214,45 +539,67 @@ class OllamaClient:
                 temperature=0.7,
             )
 
-            print(f"DEBUG: Description API call successful")
+            logger.debug("Description API call successful")
 
             description = response.choices[0].message.content.strip()
-            print(f"DEBUG: Generated description length: {len(description)} characters")
+            logger.debug("Generated description length: %d", len(description))
             return description, None
 
         except Exception as e:
             return "", f"Error generating description: {e}"
 
     def generate_image_analysis(
-        self, image_path: str
+        self, image_path: str, image: Optional[Image.Image] = None
     ) -> tuple[Dict[str, Any], Optional[str]]:
         """
         Generate comprehensive image analysis including tags and description.
 
         Args:
             image_path: Path to the image file
+            image: Image already downsized to Config.MAX_IMAGE_SIZE, decoded
+                from image_path if None
 
         Returns:
             Tuple of (analysis_result, error_message)
         """
         try:
-            print(f"DEBUG: Starting comprehensive image analysis for: {image_path}")
-
-            # Generate tags
-            print(f"DEBUG: Step 1 - Generating tags")
-            tags, error = self.generate_tags(image_path)
-            if error:
-                print(f"DEBUG: Tag generation failed: {error}")
-                return {"error": error}, error
-            print(f"DEBUG: Generated {len(tags)} tags: {tags}")
-
-            # Generate description
-            print(f"DEBUG: Step 2 - Generating description")
-            description, error = self.generate_description(image_path)
-            if error:
-                print(f"DEBUG: Description generation failed: {error}")
-                return {"error": error}, error
-            print(f"DEBUG: Description generated successfully")
+            logger.debug("Starting comprehensive image analysis for: %s", image_path)
+
+            # Every request uploads the same downsized JPEG; a missing or
+            # oversized file fails here before any request is made
+            if image is None:
+                image_base64, error = self._encode_checked(image_path)
+                if error:
+                    return {"error": error}, error
+            else:
+                image_base64 = self.encode_image(image)
+
+            # One request for both fields halves the image uploads
+            logger.debug("Generating tags and description in one request")
+            combined, error = self._generate_combined(image_base64)
+            if not error:
+                tags, description = combined["tags"], combined["description"]
+            else:
+                logger.debug(
+                    "Combined analysis failed, using separate requests: %s", error
+                )
+
+                # The two requests are independent, run them at the same time
+                description_future = self._request_executor.submit(
+                    self.generate_description, image_path, image_base64=image_base64
+                )
+
+                # Generate tags
+                tags, error = self.generate_tags(image_path, image_base64=image_base64)
+                # Wait for the description either way, its request is in flight
+                description, description_error = description_future.result()
+                if error:
+                    logger.debug("Tag generation failed: %s", error)
+                    return {"error": error}, error
+                if description_error:
+                    logger.debug("Description generation failed: %s", description_error)
+                    return {"error": description_error}, description_error
+            logger.debug("Generated %d tags: %s", len(tags), tags)
 
             # Create analysis result
             result = {
@@ -263,7 +610,7 @@ class OllamaClient:
                 "image_path": image_path,
             }
 
-            print(f"DEBUG: Image analysis completed successfully")
+            logger.debug("Image analysis completed successfully")
             return result, None
 
         except Exception as e:
@@ -271,6 +618,12 @@ class OllamaClient:
 
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the current model."""
+        return self._cached_probe(
+            "get_model_info", self._get_model_info, lambda info: "error" not in info
+        )
+
+    def _get_model_info(self) -> Dict[str, Any]:
+        """Get information about the current model with a request."""
         try:
             model = self.client.models.retrieve(self.model_name)
             return {
@@ -289,6 +642,12 @@ class OllamaClient:
 
     def list_models(self) -> tuple[List[Dict[str, Any]], Optional[str]]:
         """List available models from Ollama."""
+        return self._cached_probe(
+            "list_models", self._list_models, lambda result: result[1] is None
+        )
+
+    def _list_models(self) -> tuple[List[Dict[str, Any]], Optional[str]]:
+        """List available models from Ollama with a request."""
         try:
             models = self.client.models.list()
             model_list = []
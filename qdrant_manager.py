@@ -2,23 +2,142 @@
 Qdrant manager for vector database operations.
 """
 
+import copy
+import logging
 import os
+import threading
 import time
 import uuid
-from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from itertools import islice
+from types import MappingProxyType
+from typing import (
+    Dict,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 from datetime import datetime
 
+import numpy as np
+
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
 from config import Config
-from utils import _sanitize_for_json, create_payload
+from utils import _sanitize_for_json, create_payloads
+
+logger = logging.getLogger(__name__)
+
+# CLIP ViT-L/14 produces 768-dimensional embeddings
+EMBEDDING_DIM = 768
+
+# Qdrant distances by metric name
+_DISTANCE_MAP: Mapping[str, models.Distance] = MappingProxyType(
+    {
+        "cosine": models.Distance.COSINE,
+        "euclid": models.Distance.EUCLID,
+        "dot": models.Distance.DOT,
+        "manhattan": models.Distance.MANHATTAN,
+    }
+)
+
+
+def _distance_for(distance_metric: str) -> models.Distance:
+    """Look up the Qdrant distance of a metric name, rejecting unknown ones."""
+    try:
+        return _DISTANCE_MAP[distance_metric]
+    except KeyError:
+        raise ValueError(f"Unknown distance metric: {distance_metric}") from None
+
+
+# Vectors are stored once, in the collection for this metric
+STORAGE_METRIC = "cosine"
+
+# Candidates fetched per result when re-ranking for another metric
+RERANK_OVERSAMPLING = 4
+
+
+def point_id_for(image_id: str) -> str:
+    """Derive the deterministic Qdrant point ID of an image ID."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, image_id))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length, leaving all-zero rows unchanged."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _rerank(
+    query_embedding: List[float], points: List[Any], distance_metric: str
+) -> List[Tuple[float, Any]]:
+    """
+    Re-rank cosine search candidates by another distance metric.
+
+    Args:
+        query_embedding: Query embedding vector
+        points: Scored points returned with their vectors
+        distance_metric: "euclid", "manhattan" or "dot"
+
+    Returns:
+        (score, point) pairs, best first; euclid and manhattan scores are
+        distances, so lower is better for them
+    """
+    if not points:
+        return []
+    query = np.asarray(query_embedding, dtype=np.float32)
+    vectors = np.asarray([point.vector for point in points], dtype=np.float32)
+
+    if distance_metric == "euclid":
+        scores = np.linalg.norm(vectors - query, axis=1)
+    elif distance_metric == "manhattan":
+        scores = np.abs(vectors - query).sum(axis=1)
+    else:
+        scores = vectors @ query
+
+    order = np.argsort(scores)
+    if distance_metric == "dot":
+        order = order[::-1]
+    return [(float(scores[i]), points[i]) for i in order]
 
 
 class QdrantManager:
     """Manager for Qdrant vector database operations."""
 
+    # Clients by connection settings, shared by all managers of a process
+    _shared_clients: Dict[Tuple, QdrantClient] = {}
+    _shared_clients_lock = threading.Lock()
+
+    @classmethod
+    def get_shared_client(cls) -> QdrantClient:
+        """Return the process-wide client for the configured Qdrant server."""
+        key = (
+            Config.QDRANT_HOST,
+            Config.QDRANT_PORT,
+            Config.QDRANT_GRPC_PORT,
+            Config.QDRANT_PREFER_GRPC,
+            Config.QDRANT_TIMEOUT,
+        )
+        with cls._shared_clients_lock:
+            client = cls._shared_clients.get(key)
+            if client is None:
+                client = QdrantClient(
+                    host=Config.QDRANT_HOST,
+                    port=Config.QDRANT_PORT,
+                    grpc_port=Config.QDRANT_GRPC_PORT,
+                    prefer_grpc=Config.QDRANT_PREFER_GRPC,
+                    timeout=Config.QDRANT_TIMEOUT,
+                )
+                cls._shared_clients[key] = client
+            return client
+
     def __init__(self):
         """Initialize the Qdrant manager."""
         self.host = Config.QDRANT_HOST
@@ -26,18 +145,33 @@ class QdrantManager:
         self.timeout = Config.QDRANT_TIMEOUT
         self.collection_name = Config.COLLECTION_NAME
         self.distance_metrics = Config.get_distance_metrics()
+        self._collection_names: Dict[str, str] = {
+            distance: Config.get_qdrant_collection_name(distance)
+            for distance in (*self.distance_metrics, STORAGE_METRIC)
+        }
+        # Other metrics are served from this collection by re-ranking
+        self.storage_collection_name = self._collection_names[STORAGE_METRIC]
 
         # Initialize Qdrant client
         try:
-            self.client = QdrantClient(
-                host=self.host, port=self.port, timeout=self.timeout
+            self.client = self.get_shared_client()
+            transport = "gRPC" if Config.QDRANT_PREFER_GRPC else "HTTP"
+            logger.info(
+                "Connected to Qdrant at %s:%s (%s)", self.host, self.port, transport
             )
-            print(f"Connected to Qdrant at {self.host}:{self.port}")
         except Exception as e:
             raise Exception(f"Failed to connect to Qdrant: {e}")
 
         # Initialize collections
         self.collections_created = False
+        # Collection names on the server, fetched on first use
+        self._existing_collections: Optional[set] = None
+
+        # Search results by query, cleared whenever the stored points change
+        # (stored_at, results) by query
+        self._query_cache: OrderedDict = OrderedDict()
+        self._query_cache_lock = threading.RLock()
+        self.query_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
 
     def check_connection(self) -> tuple[bool, Optional[str]]:
         """Check connection to Qdrant server."""
@@ -48,36 +182,52 @@ class QdrantManager:
         except Exception as e:
             return False, f"Connection failed: {e}"
 
+    def _get_existing_collections(self, refresh: bool = False) -> set:
+        """Names of the collections on the server, fetched with one request."""
+        if refresh or self._existing_collections is None:
+            self._existing_collections = {
+                collection.name
+                for collection in self.client.get_collections().collections
+            }
+        return self._existing_collections
+
     def create_collections(self) -> tuple[bool, Optional[str]]:
-        """Create collections for different distance metrics."""
+        """Create the storage collection shared by all distance metrics."""
         if self.collections_created:
             return True, "Collections already created"
 
         try:
-            for distance in self.distance_metrics:
-                collection_name = Config.get_qdrant_collection_name(distance)
-
-                # Check if collection exists
-                if self.client.collection_exists(collection_name=collection_name):
-                    print(f"Collection {collection_name} already exists")
-                    continue
-
-                # Create collection
-                distance_map = {
-                    "cosine": models.Distance.COSINE,
-                    "euclid": models.Distance.EUCLID,
-                    "dot": models.Distance.DOT,
-                    "manhattan": models.Distance.MANHATTAN,
-                }
+            existing = self._get_existing_collections()
+            collection_name = self.storage_collection_name
 
+            if collection_name in existing:
+                logger.info("Collection %s already exists", collection_name)
+                self._ensure_quantization(collection_name)
+            else:
                 self.client.create_collection(
                     collection_name=collection_name,
                     vectors_config=models.VectorParams(
-                        size=768,  # CLIP-Model produces 768-dimensional embeddings
-                        distance=distance_map.get(distance, models.Distance.COSINE),
+                        size=EMBEDDING_DIM,
+                        distance=_distance_for(STORAGE_METRIC),
+                        # Full precision vectors are only read for rescoring
+                        on_disk=True,
+                    ),
+                    quantization_config=self._quantization_config(),
+                    # Payloads are read for the returned hits only, while the
+                    # HNSW graph stays in RAM for the search hot path
+                    on_disk_payload=Config.QDRANT_ON_DISK_PAYLOAD,
+                    hnsw_config=models.HnswConfigDiff(
+                        m=Config.QDRANT_HNSW_M,
+                        ef_construct=Config.QDRANT_HNSW_EF_CONSTRUCT,
+                        on_disk=False,
+                    ),
+                    optimizers_config=models.OptimizersConfigDiff(
+                        memmap_threshold=Config.QDRANT_MEMMAP_THRESHOLD
                     ),
                 )
-                print(f"Created collection: {collection_name}")
+                existing.add(collection_name)
+                logger.info("Created collection: %s", collection_name)
+            self._ensure_payload_indexes(collection_name)
 
             self.collections_created = True
             return True, "Collections created successfully"
@@ -85,8 +235,135 @@ class QdrantManager:
         except Exception as e:
             return False, f"Failed to create collections: {e}"
 
+    def _build_batch(
+        self, items: List[Tuple[Dict[str, Any], Union[List[float], np.ndarray]]]
+    ) -> models.Batch:
+        """Build a column-wise Qdrant batch of images."""
+        vectors = np.asarray(
+            [embedding for _, embedding in items], dtype=np.float32
+        ).reshape(len(items), -1)
+        if vectors.shape[1] != EMBEDDING_DIM:
+            raise ValueError(
+                f"Expected {EMBEDDING_DIM}-dimensional embeddings, got {vectors.shape[1]}"
+            )
+
+        # Unit vectors make cosine a plain dot product, also when re-ranking
+        vectors = _normalize(vectors)
+
+        return models.Batch(
+            # Point IDs follow from image IDs, so lookups need no filter
+            ids=[
+                point_id_for(image_data["image_id"])
+                if image_data.get("image_id")
+                else str(uuid.uuid4())
+                for image_data, _ in items
+            ],
+            # One conversion for the whole matrix; Batch validates float lists
+            vectors=vectors.tolist(),
+            payloads=create_payloads([image_data for image_data, _ in items]),
+        )
+
+    def _iter_points(
+        self,
+        items: Iterable[Tuple[Dict[str, Any], Union[List[float], np.ndarray]]],
+        chunk_size: int,
+    ) -> Iterator[models.PointStruct]:
+        """Lazily build points, preparing the vectors chunk by chunk."""
+        iterator = iter(items)
+        while chunk := list(islice(iterator, chunk_size)):
+            batch = self._build_batch(chunk)
+            for point_id, vector, payload in zip(
+                batch.ids, batch.vectors, batch.payloads
+            ):
+                yield models.PointStruct(id=point_id, vector=vector, payload=payload)
+
+    def _quantization_config(self) -> models.ScalarQuantization:
+        """Int8 scalar quantization kept in RAM for the image vectors."""
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True,
+            )
+        )
+
+    def _ensure_quantization(self, collection_name: str) -> None:
+        """Enable quantization on a collection created without it."""
+        try:
+            info = self.client.get_collection(collection_name)
+            if info.config.quantization_config is None:
+                self.client.update_collection(
+                    collection_name=collection_name,
+                    quantization_config=self._quantization_config(),
+                )
+                logger.info("Enabled int8 quantization for %s", collection_name)
+        except Exception as e:
+            logger.warning(
+                "Could not enable quantization for %s: %s", collection_name, e
+            )
+
+    def _ensure_payload_indexes(self, collection_name: str) -> None:
+        """Index the payload fields used for exact lookups and filters."""
+        for field_name, field_schema in Config.PAYLOAD_INDEXES.items():
+            try:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType(field_schema),
+                )
+            except Exception as e:
+                logger.warning(
+                    "Could not index %s for %s: %s", field_name, collection_name, e
+                )
+
+    def _build_tag_filter(self, tags: List[str]) -> models.Filter:
+        """Match points carrying any of the tags, ignoring case."""
+        return models.Filter(
+            should=[
+                models.FieldCondition(
+                    key="ai_tags_lc",
+                    match=models.MatchAny(any=[tag.lower() for tag in tags]),
+                ),
+                # Points stored before ai_tags_lc existed
+                models.FieldCondition(
+                    key="ai_tags", match=models.MatchAny(any=list(tags))
+                ),
+            ]
+        )
+
+    def find_by_content_hash(
+        self, content_hash: str
+    ) -> tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Look up the payload of an image stored with the given content hash.
+
+        Args:
+            content_hash: Hash of the image file bytes
+
+        Returns:
+            Tuple of (payload or None, error_message)
+        """
+        try:
+            points, _ = self.client.scroll(
+                collection_name=self.storage_collection_name,
+                scroll_filter=models.Filter(
+                    must=[
+                        models.FieldCondition(
+                            key="content_hash",
+                            match=models.MatchValue(value=content_hash),
+                        )
+                    ]
+                ),
+                limit=1,
+                with_payload=True,
+                with_vectors=False,
+            )
+            return (points[0].payload if points else None), None
+        except Exception as e:
+            return None, f"Content hash lookup failed: {e}"
+
     def upsert_image(
-        self, image_data: Dict[str, Any], embedding: List[float]
+        self, image_data: Dict[str, Any], embedding: Union[List[float], np.ndarray]
     ) -> tuple[bool, Optional[str]]:
         """
         Upsert image data into Qdrant collections.
@@ -95,33 +372,240 @@ class QdrantManager:
             image_data: Dictionary containing image metadata
             embedding: Image embedding vector
 
+        Returns:
+            Tuple of (success, error_message)
+        """
+        return self.upsert_images_batch([(image_data, embedding)])
+
+    def upsert_images_batch(
+        self,
+        items: List[Tuple[Dict[str, Any], Union[List[float], np.ndarray]]],
+        wait: bool = True,
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Upsert several images into Qdrant collections with one request each.
+
+        Args:
+            items: (image_data, embedding) pairs
+            wait: Whether to wait until Qdrant has applied the points
+
         Returns:
             Tuple of (success, error_message)
         """
         try:
-            # Generate unique ID for the image
-            point_id = str(uuid.uuid4())
+            if not items:
+                return True, None
+            points = self._build_batch(items)
 
-            # Create payload
-            payload = create_payload(image_data)
+            # Every metric is served from the one storage collection
+            self.client.upsert(
+                collection_name=self.storage_collection_name, points=points, wait=wait
+            )
+            self._clear_query_cache()
 
-            # Upsert into all collections
-            for distance in self.distance_metrics:
-                collection_name = Config.get_qdrant_collection_name(distance)
+            return True, None
 
-                self.client.upsert(
-                    collection_name=collection_name,
-                    points=[
-                        models.PointStruct(
-                            id=point_id, vector=embedding, payload=payload
-                        )
-                    ],
-                )
+        except Exception as e:
+            return False, f"Failed to upsert images: {e}"
+
+    def upsert_images_stream(
+        self,
+        items: Iterable[Tuple[Dict[str, Any], Union[List[float], np.ndarray]]],
+        batch_size: int = 256,
+    ) -> tuple[int, Optional[str]]:
+        """
+        Upsert images from an iterable in fixed-size batches.
+
+        Only one batch is held in memory at a time, and all but the last
+        batch are sent without waiting so that Qdrant indexes while the
+        next batch is being prepared.
 
+        Args:
+            items: (image_data, embedding) pairs, consumed lazily
+            batch_size: Number of images per upsert request
+
+        Returns:
+            Tuple of (number of images upserted, error_message)
+        """
+        iterator = iter(items)
+        upserted = 0
+        batch = list(islice(iterator, batch_size))
+        while batch:
+            next_batch = list(islice(iterator, batch_size))
+            # Waiting on the final batch makes all points visible on return
+            success, error = self.upsert_images_batch(batch, wait=not next_batch)
+            if not success:
+                return upserted, error
+            upserted += len(batch)
+            batch = next_batch
+
+        return upserted, None
+
+    def bulk_upsert(
+        self,
+        items: Iterable[Tuple[Dict[str, Any], Union[List[float], np.ndarray]]],
+        batch_size: int = 256,
+        parallel: Optional[int] = None,
+        wait: bool = False,
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Upload many images with the client's batched, parallel uploader.
+
+        Args:
+            items: (image_data, embedding) pairs, consumed lazily
+            batch_size: Number of points per upload request
+            parallel: Upload workers, Config.QDRANT_UPLOAD_PARALLEL if None
+            wait: Whether to wait until Qdrant has applied the points. Without
+                waiting, searches cached right after the upload may still
+                miss them until the cache entries expire
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        try:
+            self.client.upload_points(
+                collection_name=self.storage_collection_name,
+                points=self._iter_points(items, batch_size),
+                batch_size=batch_size,
+                parallel=parallel or Config.QDRANT_UPLOAD_PARALLEL,
+                wait=wait,
+            )
+            self._clear_query_cache()
             return True, None
 
         except Exception as e:
-            return False, f"Failed to upsert image: {e}"
+            return False, f"Failed to upload images: {e}"
+
+    def _query_cache_get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the cached results for a query, if still fresh."""
+        with self._query_cache_lock:
+            entry = self._query_cache.get(key)
+            ttl = Config.SEARCH_RESULT_CACHE_TTL
+            if entry is None or time.monotonic() - entry[0] > ttl:
+                if entry is not None:
+                    del self._query_cache[key]
+                self.query_cache_stats["misses"] += 1
+                return None
+            self._query_cache.move_to_end(key)
+            self.query_cache_stats["hits"] += 1
+            # Callers may modify the payloads they get back
+            return copy.deepcopy(entry[1])
+
+    def _query_cache_put(self, key: Tuple, results: List[Dict[str, Any]]) -> None:
+        """Cache the results for a query, evicting the least recently used."""
+        if Config.SEARCH_RESULT_CACHE_SIZE <= 0:
+            return
+        with self._query_cache_lock:
+            self._query_cache[key] = (time.monotonic(), copy.deepcopy(results))
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > Config.SEARCH_RESULT_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+                self.query_cache_stats["evictions"] += 1
+
+    def _clear_query_cache(self) -> None:
+        """Drop all cached search results."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+
+    def _query_cache_key(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        limit: int,
+        distance_metric: str,
+        score_threshold: Optional[float],
+        tags: Optional[List[str]],
+        exact: bool,
+    ) -> Tuple:
+        """Build the result cache key for one similarity query."""
+        return (
+            np.asarray(query_embedding, dtype=np.float32).tobytes(),
+            limit,
+            distance_metric,
+            score_threshold,
+            tuple(sorted(tags)) if tags else None,
+            exact,
+        )
+
+    def _build_query_request(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        limit: int,
+        distance_metric: str,
+        tags: Optional[List[str]],
+        exact: bool,
+    ) -> models.QueryRequest:
+        """Build the Qdrant request for one similarity query."""
+        if isinstance(query_embedding, np.ndarray):
+            query_embedding = query_embedding.tolist()
+        rerank = distance_metric != STORAGE_METRIC
+        fetch_limit = limit * RERANK_OVERSAMPLING if rerank else limit
+
+        # Int8 vectors pick the candidates, full precision rescores them;
+        # the HNSW beam grows with the number of results requested
+        search_params = models.SearchParams(
+            hnsw_ef=max(64, fetch_limit * 4),
+            exact=exact,
+            quantization=models.QuantizationSearchParams(
+                rescore=True, oversampling=2.0
+            ),
+        )
+
+        # The tag filter is applied during the search, before the top-k cut;
+        # other metrics re-rank an oversampled cosine candidate set
+        return models.QueryRequest(
+            query=query_embedding,
+            filter=self._build_tag_filter(tags) if tags else None,
+            params=search_params,
+            limit=fetch_limit,
+            with_payload=True,
+            with_vector=rerank,
+        )
+
+    def _score_results(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        points: List[Any],
+        limit: int,
+        distance_metric: str,
+        score_threshold: Optional[float],
+    ) -> List[Dict[str, Any]]:
+        """Rank the points of one similarity query and apply the threshold."""
+        if distance_metric != STORAGE_METRIC:
+            scored = _rerank(query_embedding, points, distance_metric)[:limit]
+        else:
+            scored = [(point.score, point) for point in points]
+        # Distances are better when lower, similarities when higher
+        lower_is_better = distance_metric in ("euclid", "manhattan")
+
+        # Process results
+        results = []
+        for score, point in scored:
+            result = {
+                "id": point.id,
+                "score": score,
+                "payload": point.payload,
+                "distance": score if distance_metric != "dot" else None,
+            }
+
+            # DEBUG: Log scores for analysis
+            logger.debug("Found result with score: %.3f", score)
+
+            # Filter by score threshold if provided
+            if score_threshold is not None and (
+                score >= score_threshold
+                if lower_is_better
+                else score <= score_threshold
+            ):
+                logger.debug(
+                    "Filtering out result with score %.3f (threshold %s)",
+                    score,
+                    score_threshold,
+                )
+                continue
+
+            results.append(result)
+
+        return results
 
     def search_similar_images(
         self,
@@ -129,6 +613,8 @@ class QdrantManager:
         limit: int = 10,
         distance_metric: str = None,
         score_threshold: float = None,
+        tags: List[str] = None,
+        exact: bool = False,
     ) -> tuple[List[Dict[str, Any]], Optional[str]]:
         """
         Search for similar images based on embedding similarity.
@@ -137,49 +623,86 @@ class QdrantManager:
             query_embedding: Query embedding vector
             limit: Maximum number of results
             distance_metric: Distance metric to use for search
+            tags: Only return images with any of these tags
+            exact: Brute-force scan instead of the HNSW index, for evaluation
 
         Returns:
             Tuple of (results, error_message)
         """
+        results, error = self.search_similar_images_batch(
+            [query_embedding],
+            limit=limit,
+            distance_metric=distance_metric,
+            score_threshold=score_threshold,
+            tags=tags,
+            exact=exact,
+        )
+        return (results[0] if results else []), error
+
+    def search_similar_images_batch(
+        self,
+        query_embeddings: List[List[float]],
+        limit: int = 10,
+        distance_metric: str = None,
+        score_threshold: float = None,
+        tags: List[str] = None,
+        exact: bool = False,
+    ) -> tuple[List[List[Dict[str, Any]]], Optional[str]]:
+        """
+        Search for several query embeddings with one Qdrant request.
+
+        Args:
+            query_embeddings: Query embedding vectors
+            limit: Maximum number of results per query
+            distance_metric: Distance metric to use for search
+            tags: Only return images with any of these tags
+            exact: Brute-force scan instead of the HNSW index, for evaluation
+
+        Returns:
+            Tuple of (results per query, error_message)
+        """
         try:
-            # Use the first available distance metric if none provided
+            # Use the storage metric if none provided
             if distance_metric is None:
-                distance_metric = (
-                    self.distance_metrics[0] if self.distance_metrics else "cosine"
+                distance_metric = STORAGE_METRIC
+            # Raises for misspelled metrics instead of silently re-ranking
+            _distance_for(distance_metric)
+            # Queries are compared against the unit vectors that were stored
+            query_embeddings = _normalize(
+                np.asarray(query_embeddings, dtype=np.float32).reshape(
+                    len(query_embeddings), -1
                 )
-            collection_name = Config.get_qdrant_collection_name(distance_metric)
-
-            # Search for similar images
-            search_params = models.SearchParams(hnsw_ef=256, exact=True)
-
-            search_result = self.client.query_points(
-                collection_name=collection_name,
-                query=query_embedding,
-                search_params=search_params,
-                limit=limit,
             )
 
-            # Process results
-            results = []
-            for point in search_result.points:
-                result = {
-                    "id": point.id,
-                    "score": point.score,
-                    "payload": point.payload,
-                    "distance": point.score if distance_metric == "cosine" else None,
-                }
-
-                # DEBUG: Log scores for analysis
-                print(f"DEBUG: Found result with score: {point.score:.3f}")
-
-                # Filter by score threshold if provided
-                if score_threshold is not None and point.score <= score_threshold:
-                    print(
-                        f"DEBUG: Filtering out result with score {point.score:.3f} (<= {score_threshold})"
+            cache_keys = [
+                self._query_cache_key(
+                    embedding, limit, distance_metric, score_threshold, tags, exact
+                )
+                for embedding in query_embeddings
+            ]
+            results = [self._query_cache_get(key) for key in cache_keys]
+            pending = [i for i, cached in enumerate(results) if cached is None]
+
+            # Only the queries missing from the cache go to Qdrant
+            if pending:
+                responses = self.client.query_batch_points(
+                    collection_name=self.storage_collection_name,
+                    requests=[
+                        self._build_query_request(
+                            query_embeddings[i], limit, distance_metric, tags, exact
+                        )
+                        for i in pending
+                    ],
+                )
+                for i, response in zip(pending, responses):
+                    results[i] = self._score_results(
+                        query_embeddings[i],
+                        response.points,
+                        limit,
+                        distance_metric,
+                        score_threshold,
                     )
-                    continue
-
-                results.append(result)
+                    self._query_cache_put(cache_keys[i], results[i])
 
             return results, None
 
@@ -209,12 +732,8 @@ class QdrantManager:
             Tuple of (results, error_message)
         """
         try:
-            # Use the first available distance metric if none provided
-            if distance_metric is None:
-                distance_metric = (
-                    self.distance_metrics[0] if self.distance_metrics else "cosine"
-                )
-            collection_name = Config.get_qdrant_collection_name(distance_metric)
+            # All metrics share the storage collection
+            collection_name = self.storage_collection_name
 
             # Build filter conditions
             must_conditions = []
@@ -287,7 +806,7 @@ class QdrantManager:
                 # First, let's check the actual collection configuration
                 collection_info = self.client.get_collection(collection_name=collection_name)
                 actual_vector_size = collection_info.config.params.vectors.size
-                print(f"DEBUG: Collection {collection_name} actual vector size: {actual_vector_size}")
+                logger.debug("Collection %s actual vector size: %s", collection_name, actual_vector_size)
                 
                 # Use search method instead of query_points for better filter support
                 # Don't use score threshold for metadata search since dummy vectors produce meaningless scores
@@ -295,14 +814,14 @@ class QdrantManager:
                 search_params = {}
                 if score_threshold is not None:
                     # Only apply score threshold for vector similarity searches, not metadata searches
-                    print("DEBUG: Score threshold not applied for metadata search (dummy vectors)")
+                    logger.debug("Score threshold not applied for metadata search (dummy vectors)")
                 else:
-                    print("DEBUG: No score threshold provided for metadata search")
+                    logger.debug("No score threshold provided for metadata search")
 
                 # Use dummy vector with correct dimension to match collection configuration
                 dummy_vector = [0] * actual_vector_size
-                print(f"DEBUG: Using dummy query vector with correct dimension: {len(dummy_vector)}")
-                print(f"DEBUG: Query filter: {query_filter}")
+                logger.debug("Using dummy query vector with correct dimension: %s", len(dummy_vector))
+                logger.debug("Query filter: %s", query_filter)
                 
                 search_result = self.client.search(
                     collection_name=collection_name,
@@ -312,17 +831,17 @@ class QdrantManager:
                     with_payload=True,
                     **search_params,
                 )
-                print(f"DEBUG: Search method succeeded, result type: {type(search_result)}")
+                logger.debug("Search method succeeded, result type: %s", type(search_result))
             except Exception as e:
-                print(f"DEBUG: Search method failed with error: {e}")
+                logger.debug("Search method failed with error: %s", e)
                 # If search fails, try query_points without score_threshold
                 # Use dummy vector with correct dimension in fallback as well
                 try:
                     collection_info = self.client.get_collection(collection_name=collection_name)
                     actual_vector_size = collection_info.config.params.vectors.size
                     dummy_vector = [0] * actual_vector_size
-                    print(f"DEBUG: Fallback to query_points with correct dummy vector dimension: {len(dummy_vector)}")
-                    print(f"DEBUG: Query filter for fallback: {query_filter}")
+                    logger.debug("Fallback to query_points with correct dummy vector dimension: %s", len(dummy_vector))
+                    logger.debug("Query filter for fallback: %s", query_filter)
                     
                     search_result = self.client.query_points(
                         collection_name=collection_name,
@@ -331,19 +850,19 @@ class QdrantManager:
                         limit=limit,
                         with_payload=True,
                     )
-                    print(f"DEBUG: Query_points method succeeded, result type: {type(search_result)}")
+                    logger.debug("Query_points method succeeded, result type: %s", type(search_result))
                 except Exception as fallback_e:
-                    print(f"DEBUG: Query_points method also failed with error: {fallback_e}")
+                    logger.debug("Query_points method also failed with error: %s", fallback_e)
                     raise fallback_e
 
             # Process results
             results = []
-            print(f"DEBUG: Processing search results, result type: {type(search_result)}")
+            logger.debug("Processing search results, result type: %s", type(search_result))
 
             # Handle different response formats
             if hasattr(search_result, "points"):
                 # query_points response format
-                print(f"DEBUG: Found {len(search_result.points)} points in query_points response")
+                logger.debug("Found %s points in query_points response", len(search_result.points))
                 for point in search_result.points:
                     result = {
                         "id": point.id,
@@ -356,13 +875,13 @@ class QdrantManager:
                     # All metadata matches should be returned
 
                     results.append(result)
-                    print(f"DEBUG: Added result with ID: {point.id}")
+                    logger.debug("Added result with ID: %s", point.id)
             else:
                 # search response format
                 if hasattr(search_result, "__len__"):
-                    print(f"DEBUG: Found {len(search_result)} hits in search response")
+                    logger.debug("Found %s hits in search response", len(search_result))
                 else:
-                    print(f"DEBUG: Search result doesn't have length attribute")
+                    logger.debug("Search result doesn't have length attribute")
                 
                 for hit in search_result:
                     result = {
@@ -376,9 +895,9 @@ class QdrantManager:
                     # All metadata matches should be returned
 
                     results.append(result)
-                    print(f"DEBUG: Added result with ID: {hit.id}, score: {hit.score}")
+                    logger.debug("Added result with ID: %s, score: %s", hit.id, hit.score)
 
-            print(f"DEBUG: Total results after processing: {len(results)}")
+            logger.debug("Total results after processing: %s", len(results))
 
             return results, None
 
@@ -398,84 +917,117 @@ class QdrantManager:
         Returns:
             Tuple of (image_data, error_message)
         """
-        try:
-            # Use the first available distance metric if none provided
-            if distance_metric is None:
-                distance_metric = (
-                    self.distance_metrics[0] if self.distance_metrics else "cosine"
-                )
-            collection_name = Config.get_qdrant_collection_name(distance_metric)
+        images, error = self.get_images_by_ids([image_id])
+        if error:
+            return None, error
+        if not images:
+            return None, "Image not found"
+        return images[0], None
+
+    def get_images_by_ids(
+        self, image_ids: List[str]
+    ) -> tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get the data of several images with one request.
+
+        Args:
+            image_ids: Image IDs to retrieve
 
-            # Get image data
+        Returns:
+            Tuple of (found images, error_message); unknown IDs are left out
+        """
+        try:
+            # All metrics share the storage collection
             result = self.client.retrieve(
-                collection_name=collection_name, ids=[image_id]
+                collection_name=self.storage_collection_name,
+                ids=[point_id_for(image_id) for image_id in image_ids],
             )
 
-            if result:
-                return {
-                    "id": result[0].id,
-                    "payload": result[0].payload,
-                    "vector": result[0].vector,
-                }, None
-            else:
-                return None, "Image not found"
+            # Points stored before IDs were derived from image IDs have
+            # random IDs, find those through the indexed image_id field
+            found = {(point.payload or {}).get("image_id") for point in result}
+            missing = [image_id for image_id in image_ids if image_id not in found]
+            if missing:
+                legacy, _ = self.client.scroll(
+                    collection_name=self.storage_collection_name,
+                    scroll_filter=models.Filter(
+                        must=[
+                            models.FieldCondition(
+                                key="image_id",
+                                match=models.MatchAny(any=missing),
+                            )
+                        ]
+                    ),
+                    limit=len(missing),
+                )
+                result = list(result) + list(legacy)
+
+            return [
+                {"id": point.id, "payload": point.payload, "vector": point.vector}
+                for point in result
+            ], None
 
         except Exception as e:
-            return None, f"Failed to retrieve image: {e}"
+            return [], f"Failed to retrieve image: {e}"
 
-    def delete_image(self, image_id: str) -> tuple[bool, Optional[str]]:
+    def delete_image(
+        self, image_id: str, point_id: Optional[str] = None
+    ) -> tuple[bool, Optional[str]]:
         """
-        Delete image from all collections.
+        Delete image from the storage collection.
 
         Args:
             image_id: Image ID to delete
+            point_id: Qdrant point ID of the image, as returned by searches
 
         Returns:
             Tuple of (success, error_message)
         """
         try:
-            # Delete from all collections
-            for distance in self.distance_metrics:
-                collection_name = Config.get_qdrant_collection_name(distance)
-
-                self.client.delete(
-                    collection_name=collection_name,
-                    points_selector=models.FilterSelector(
-                        filter=models.Filter(
-                            must=[
-                                models.FieldCondition(
-                                    key="image_id",
-                                    match=models.MatchValue(value=image_id),
-                                )
-                            ]
-                        )
-                    ),
+            if point_id is not None:
+                # Deleting by ID needs no payload lookup on the server
+                points_selector = models.PointIdsList(points=[point_id])
+            else:
+                # The image_id filter also matches points stored before IDs
+                # were derived from image IDs
+                points_selector = models.FilterSelector(
+                    filter=models.Filter(
+                        must=[
+                            models.FieldCondition(
+                                key="image_id",
+                                match=models.MatchValue(value=image_id),
+                            )
+                        ]
+                    )
                 )
 
+            self.client.delete(
+                collection_name=self.storage_collection_name,
+                points_selector=points_selector,
+            )
+            self._clear_query_cache()
+
             return True, None
 
         except Exception as e:
             return False, f"Failed to delete image: {e}"
 
     def get_collection_stats(
-        self, distance_metric: str = "cosine"
+        self, distance_metric: str = "cosine", verbose: bool = False
     ) -> tuple[Dict[str, Any], Optional[str]]:
         """
         Get collection statistics.
 
         Args:
             distance_metric: Distance metric to get stats for
+            verbose: Also include the full serialized collection config
 
         Returns:
             Tuple of (stats, error_message)
         """
         try:
-            # Use the first available distance metric if none provided
-            if distance_metric is None:
-                distance_metric = (
-                    self.distance_metrics[0] if self.distance_metrics else "cosine"
-                )
-            collection_name = Config.get_qdrant_collection_name(distance_metric)
+            # All metrics share the storage collection
+            collection_name = self.storage_collection_name
 
             # Get collection info
             info = self.client.get_collection(collection_name)
@@ -486,8 +1038,10 @@ class QdrantManager:
                 "distance_metric": info.config.params.vectors.distance.value,
                 "status": info.status,
                 "optimizer_status": info.optimizer_status,
-                "config": info.config.dict(),
             }
+            # Serializing the nested config is only worth it on request
+            if verbose:
+                stats["config"] = info.config.dict()
 
             return stats, None
 
@@ -498,20 +1052,19 @@ class QdrantManager:
         """List all collections."""
         try:
             collections = []
-
-            for distance in self.distance_metrics:
-                collection_name = Config.get_qdrant_collection_name(distance)
-
-                if self.client.collection_exists(collection_name=collection_name):
-                    info = self.client.get_collection(collection_name)
-                    collections.append(
-                        {
-                            "name": collection_name,
-                            "vectors_count": info.config.params.vectors.size,
-                            "distance_metric": info.config.params.vectors.distance.value,
-                            "status": info.status,
-                        }
-                    )
+            existing = self._get_existing_collections(refresh=True)
+
+            collection_name = self.storage_collection_name
+            if collection_name in existing:
+                info = self.client.get_collection(collection_name)
+                collections.append(
+                    {
+                        "name": collection_name,
+                        "vectors_count": info.config.params.vectors.size,
+                        "distance_metric": info.config.params.vectors.distance.value,
+                        "status": info.status,
+                    }
+                )
 
             return collections, None
 
@@ -526,6 +1079,7 @@ class QdrantManager:
             "collection_name": self.collection_name,
             "distance_metrics": self.distance_metrics,
             "collections_created": self.collections_created,
+            "query_cache": dict(self.query_cache_stats),
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -552,14 +1106,15 @@ class QdrantManager:
     def cleanup_collections(self) -> tuple[bool, Optional[str]]:
         """Clean up all collections (delete all data)."""
         try:
-            for distance in self.distance_metrics:
-                collection_name = Config.get_qdrant_collection_name(distance)
-
-                if self.client.collection_exists(collection_name=collection_name):
+            existing = self._get_existing_collections(refresh=True)
+            for collection_name in self._collection_names.values():
+                if collection_name in existing:
                     self.client.delete_collection(collection_name=collection_name)
-                    print(f"Deleted collection: {collection_name}")
+                    existing.discard(collection_name)
+                    logger.info("Deleted collection: %s", collection_name)
 
             self.collections_created = False
+            self._clear_query_cache()
             return True, "Collections cleaned up successfully"
 
         except Exception as e:
@@ -4,18 +4,31 @@ Utility functions for the Qdrant Hackathon project.
 
 import os
 import base64
-import json
-from typing import List, Dict, Any, Optional, Tuple
+import hashlib
+import mmap
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
-from PIL import Image, UnidentifiedImageError
 import piexif
 import piexif.helper
-import exifread
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+
+if TYPE_CHECKING:
+    # PIL and geopy are imported where needed, payload-only users skip them
+    from PIL import Image
 
 from config import Config
 
+# Lowercased supported extensions for O(1) membership checks
+SUPPORTED_EXT_SET = Config.SUPPORTED_EXTENSIONS_SET
+
 
 def _sanitize_for_json(data: Any) -> Any:
     """Make data JSON serializable."""
@@ -36,6 +49,19 @@ def _sanitize_for_json(data: Any) -> Any:
         return repr(data)
 
 
+# Tag names by IFD and tag ID, the thumbnail IFD uses the same tags as 0th
+_EXIF_TAG_NAMES = {
+    ifd_name: {tag: info["name"] for tag, info in piexif.TAGS[table].items()}
+    for ifd_name, table in (
+        ("0th", "Image"),
+        ("1st", "Image"),
+        ("Exif", "Exif"),
+        ("GPS", "GPS"),
+        ("Interop", "Interop"),
+    )
+}
+
+
 def _get_exif_with_names(exif_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Get human-readable EXIF tag names."""
     exif_with_names = {}
@@ -46,70 +72,133 @@ def _get_exif_with_names(exif_dict: Dict[str, Any]) -> Dict[str, Any]:
         if not isinstance(ifd_dict, dict):
             continue
 
-        exif_with_names[ifd_name] = {}
-        for tag, value in ifd_dict.items():
-            # Use tag directly since TAGS might not be available
-            tag_name = tag
-            if ifd_name == "GPS":
-                # Use tag directly since GPSTAGS might not be available
-                gps_tag_name = tag
-                exif_with_names[ifd_name][gps_tag_name] = value
-            else:
-                exif_with_names[ifd_name][tag_name] = value
+        # One bound lookup per IFD, called once per tag
+        name_of = _EXIF_TAG_NAMES.get(ifd_name, {}).get
+        exif_with_names[ifd_name] = {
+            name_of(tag, tag): value for tag, value in ifd_dict.items()
+        }
     return exif_with_names
 
 
-def _convert_to_degrees(value) -> Optional[float]:
-    """Convert GPS coordinates to degrees."""
-    if not hasattr(value, "__len__") or len(value) < 3:
-        return None
+def get_gps_coordinates(image_path: str) -> Optional[Tuple[float, float]]:
+    """Extract GPS coordinates from image."""
+    # JPEG headers are parsed directly, other formats through PIL
+    exif_dict = read_jpeg_exif(image_path)
+    if exif_dict is None:
+        try:
+            from PIL import Image
 
+            with Image.open(image_path) as img:
+                exif_dict = load_exif_dict(img)
+        except Exception as e:
+            print(f"Error reading GPS data: {e}")
+            return None
+    return get_gps_coordinates_from_exif(exif_dict)
+
+
+def _dms_to_degrees(values) -> Optional[float]:
+    """Convert degrees/minutes/seconds rationals from piexif to degrees."""
     try:
-        d = (
-            float(value[0].num) / float(value[0].den)
-            if value[0].den != 0
-            else float(value[0].num)
-        )
-        m = (
-            float(value[1].num) / float(value[1].den)
-            if value[1].den != 0
-            else float(value[1].num)
-        )
-        s = (
-            float(value[2].num) / float(value[2].den)
-            if value[2].den != 0
-            else float(value[2].num)
+        d, m, s = (
+            float(num) / float(den) if den != 0 else float(num)
+            for num, den in values[:3]
         )
-        return d + (m / 60.0) + (s / 3600.0)
-    except (ZeroDivisionError, AttributeError, IndexError, ValueError) as e:
+    except (TypeError, ValueError) as e:
         print(f"Error converting GPS rational to degrees: {e}")
         return None
+    return d + (m / 60.0) + (s / 3600.0)
 
 
-def get_gps_coordinates(image_path: str) -> Optional[Tuple[float, float]]:
-    """Extract GPS coordinates from image."""
+def load_exif_dict(img: "Image.Image") -> Dict[str, Any]:
+    """Parse the EXIF of an already opened image into a piexif dictionary."""
+    raw_exif = img.info.get("exif")
+    if raw_exif:
+        try:
+            return piexif.load(raw_exif)
+        except Exception as e:
+            print(f"Warning: Problem loading existing EXIF: {e}")
+    return {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
+
+
+def read_jpeg_exif(image_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the EXIF of a JPEG from its header segments, without PIL.
+
+    The file is memory-mapped, so only the pages holding the markers before
+    the image data are read, and segments are skipped without copying.
+
+    Args:
+        image_path: Path to the image file
+
+    Returns:
+        piexif dictionary, with empty IFDs if the JPEG has no EXIF, or None
+        if the file is not a JPEG or its header cannot be parsed
+    """
     try:
-        with open(image_path, "rb") as f:
-            tags = exifread.process_file(f, stop_tag="GPS GPSLongitude")
+        with open(image_path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            if mm[:2] != b"\xff\xd8":
+                return None
+            pos, size = 2, len(mm)
+            while pos + 2 <= size:
+                if mm[pos] != 0xFF:
+                    return None
+                marker = mm[pos + 1]
+                pos += 2
+                # Markers may be preceded by 0xFF fill bytes
+                if marker == 0xFF:
+                    pos -= 1
+                    continue
+                # Start of scan or end of image: no EXIF segment follows
+                if marker in (0xDA, 0xD9):
+                    break
+                # Standalone markers carry no length
+                if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+                    continue
+
+                length = int.from_bytes(mm[pos : pos + 2], "big")
+                if length < 2:
+                    return None
+                if marker == 0xE1 and mm[pos + 2 : pos + 8] == b"Exif\x00\x00":
+                    return piexif.load(mm[pos + 2 : pos + length])
+                pos += length
+            else:
+                return None
+    except Exception:
+        return None
+    return {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
+
 
-        if not tags:
+def get_gps_coordinates_from_exif(
+    exif_dict: Dict[str, Any],
+) -> Optional[Tuple[float, float]]:
+    """Extract GPS coordinates from an already loaded piexif dictionary."""
+    try:
+        gps = exif_dict.get("GPS")
+        if not gps:
             return None
 
-        gps_latitude = tags.get("GPS GPSLatitude")
-        gps_latitude_ref = tags.get("GPS GPSLatitudeRef")
-        gps_longitude = tags.get("GPS GPSLongitude")
-        gps_longitude_ref = tags.get("GPS GPSLongitudeRef")
+        gps_latitude = gps.get(piexif.GPSIFD.GPSLatitude)
+        gps_latitude_ref = gps.get(piexif.GPSIFD.GPSLatitudeRef)
+        gps_longitude = gps.get(piexif.GPSIFD.GPSLongitude)
+        gps_longitude_ref = gps.get(piexif.GPSIFD.GPSLongitudeRef)
 
         if gps_latitude and gps_latitude_ref and gps_longitude and gps_longitude_ref:
-            lat = _convert_to_degrees(gps_latitude.values)
-            lon = _convert_to_degrees(gps_longitude.values)
+            lat = _dms_to_degrees(gps_latitude)
+            lon = _dms_to_degrees(gps_longitude)
 
             if lat is None or lon is None:
                 return None
 
-            if gps_latitude_ref.values[0] == "S":
+            if isinstance(gps_latitude_ref, bytes):
+                gps_latitude_ref = gps_latitude_ref.decode("ascii", "ignore")
+            if isinstance(gps_longitude_ref, bytes):
+                gps_longitude_ref = gps_longitude_ref.decode("ascii", "ignore")
+
+            if gps_latitude_ref.startswith("S"):
                 lat = -lat
-            if gps_longitude_ref.values[0] == "W":
+            if gps_longitude_ref.startswith("W"):
                 lon = -lon
 
             return lat, lon
@@ -119,15 +208,95 @@ def get_gps_coordinates(image_path: str) -> Optional[Tuple[float, float]]:
         return None
 
 
+@lru_cache(maxsize=None)
+def _get_reverse_geocoder():
+    """Return the process-wide rate-limited Nominatim reverse lookup."""
+    from geopy.extra.rate_limiter import RateLimiter
+    from geopy.geocoders import Nominatim
+
+    # One geocoding client for the process; creating it does no network I/O
+    geolocator = Nominatim(user_agent="qdrant_hackathon_v1.0")
+    # Nominatim's usage policy allows one request per second across all
+    # threads; errors are raised instead of swallowed so they are not cached
+    return RateLimiter(
+        geolocator.reverse, min_delay_seconds=1, max_retries=0, swallow_exceptions=False
+    )
+
+
+# Concurrent lookups for batches of coordinates
+GEOCODE_WORKERS = 4
+
+# Decimal places kept for cache keys, about 11 m at the equator
+GEOCODE_PRECISION = 4
+
+_geocode_db: Optional[sqlite3.Connection] = None
+_geocode_db_lock = threading.Lock()
+
+
+def _get_geocode_db() -> Optional[sqlite3.Connection]:
+    """Open the persistent geocoding cache, or None if it is unavailable."""
+    global _geocode_db
+    with _geocode_db_lock:
+        if _geocode_db is None:
+            try:
+                os.makedirs(Config.CACHE_DIR, exist_ok=True)
+                db = sqlite3.connect(
+                    os.path.join(Config.CACHE_DIR, Config.GEOCODE_CACHE_FILE),
+                    check_same_thread=False,
+                )
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS geocode ("
+                    "lat REAL, lon REAL, address TEXT, ts REAL, "
+                    "PRIMARY KEY (lat, lon))"
+                )
+                db.commit()
+                _geocode_db = db
+            except sqlite3.Error as e:
+                print(f"Warning: Geocoding cache unavailable: {e}")
+        return _geocode_db
+
+
+@lru_cache(maxsize=10000)
+def _reverse_geocode(latitude: float, longitude: float) -> Optional[str]:
+    """
+    Reverse geocode rounded coordinates through the disk cache.
+
+    Service errors propagate, so neither cache stores a failed lookup.
+    """
+    db = _get_geocode_db()
+    if db is not None:
+        with _geocode_db_lock:
+            row = db.execute(
+                "SELECT address FROM geocode WHERE lat = ? AND lon = ?",
+                (latitude, longitude),
+            ).fetchone()
+        if row is not None:
+            return row[0]
+
+    location = _get_reverse_geocoder()(
+        (latitude, longitude), exactly_one=True, language="de", timeout=10
+    )
+    address = (
+        location.address.strip().lower() if location and location.address else None
+    )
+
+    if db is not None:
+        with _geocode_db_lock:
+            db.execute(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?)",
+                (latitude, longitude, address, time.time()),
+            )
+            db.commit()
+    return address
+
+
 def get_location_from_coordinates(latitude: float, longitude: float) -> Optional[str]:
     """Get location name from GPS coordinates."""
+    from geopy.exc import GeocoderServiceError, GeocoderTimedOut
+
     try:
-        geolocator = Nominatim(user_agent="qdrant_hackathon_v1.0")
-        location = geolocator.reverse(
-            (latitude, longitude), exactly_one=True, language="de", timeout=10
-        )
-        return (
-            location.address.strip().lower() if location and location.address else None
+        return _reverse_geocode(
+            round(latitude, GEOCODE_PRECISION), round(longitude, GEOCODE_PRECISION)
         )
     except (GeocoderTimedOut, GeocoderServiceError) as e:
         print(f"Geocoding error: {e}")
@@ -137,14 +306,196 @@ def get_location_from_coordinates(latitude: float, longitude: float) -> Optional
         return None
 
 
+def get_locations_from_coordinates(
+    coordinates: List[Tuple[float, float]],
+) -> List[Optional[str]]:
+    """
+    Get location names for several GPS coordinates.
+
+    Repeated coordinates are looked up once, and cache misses are resolved
+    concurrently through the shared rate-limited client.
+
+    Args:
+        coordinates: (latitude, longitude) pairs
+
+    Returns:
+        Location names in the order of the coordinates, None where unknown
+    """
+    unique = list(dict.fromkeys(coordinates))
+    with ThreadPoolExecutor(max_workers=GEOCODE_WORKERS) as executor:
+        locations = dict(
+            zip(
+                unique,
+                executor.map(lambda c: get_location_from_coordinates(*c), unique),
+            )
+        )
+    return [locations[c] for c in coordinates]
+
+
+def _write_jpeg_user_comment(
+    image_path: str, exif_dict: Dict[str, Any], tags_str: str
+) -> Dict[str, Any]:
+    """Store tags in the EXIF UserComment of a JPEG without re-encoding it."""
+    exif_dict.setdefault("Exif", {})[piexif.ExifIFD.UserComment] = (
+        piexif.helper.UserComment.dump(tags_str, encoding="unicode")
+    )
+    # Only the APP1 segment is replaced, the image data stays as it is
+    piexif.insert(piexif.dump(exif_dict), image_path)
+
+    extracted_metadata = _get_exif_with_names(exif_dict)
+    extracted_metadata.setdefault("Exif", {})["UserComment"] = tags_str
+    return extracted_metadata
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_TEXT_CHUNKS = (b"tEXt", b"zTXt", b"iTXt")
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Serialize a PNG chunk with its length and CRC."""
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data))
+    )
+
+
+def _copy_exact(src, dst, size: int) -> None:
+    """Copy size bytes between file objects in bounded blocks."""
+    while size:
+        block = src.read(min(size, 1 << 20))
+        if not block:
+            raise ValueError("Truncated PNG chunk")
+        dst.write(block)
+        size -= len(block)
+
+
+def _splice_png_itxt(image_path: str, keyword: str, text: str, lang: str = "") -> None:
+    """
+    Replace a PNG text entry without re-encoding the image.
+
+    Text chunks with the keyword are dropped wherever they appear, the new
+    uncompressed iTXt chunk goes in front of the first IDAT chunk, and all
+    other chunks are copied byte for byte into a temporary file that then
+    replaces the original.
+    """
+    key = keyword.encode("latin-1")
+    itxt = _png_chunk(
+        b"iTXt",
+        key
+        + b"\x00\x00\x00"
+        + lang.encode("ascii")
+        + b"\x00"
+        + keyword.encode("utf-8")
+        + b"\x00"
+        + text.encode("utf-8"),
+    )
+
+    temp_path = None
+    try:
+        # Unique temp name, concurrent writers of the same file never share it
+        with open(image_path, "rb") as src, tempfile.NamedTemporaryFile(
+            suffix=".tmp", delete=False, dir=os.path.dirname(image_path) or "."
+        ) as dst:
+            temp_path = dst.name
+            if src.read(8) != PNG_SIGNATURE:
+                raise ValueError("Not a PNG file")
+            dst.write(PNG_SIGNATURE)
+            itxt_written = False
+            while True:
+                header = src.read(8)
+                if len(header) < 8:
+                    raise ValueError("Truncated PNG chunk")
+                length, chunk_type = struct.unpack(">I4s", header)
+
+                if chunk_type in _PNG_TEXT_CHUNKS:
+                    body = src.read(length + 4)  # Chunk data and CRC
+                    if len(body) < length + 4:
+                        raise ValueError("Truncated PNG chunk")
+                    if body.split(b"\x00", 1)[0] != key:
+                        dst.write(header)
+                        dst.write(body)
+                    continue
+
+                if chunk_type == b"IDAT" and not itxt_written:
+                    dst.write(itxt)
+                    itxt_written = True
+                elif chunk_type == b"IEND" and not itxt_written:
+                    raise ValueError("PNG has no image data")
+                # Image data is streamed, it is never held in memory whole
+                dst.write(header)
+                _copy_exact(src, dst, length + 4)
+                if chunk_type == b"IEND":
+                    # Anything after the end marker stays as it was
+                    shutil.copyfileobj(src, dst)
+                    break
+        # The temp file is created private, keep the image's permissions
+        shutil.copymode(image_path, temp_path)
+        os.replace(temp_path, image_path)
+        temp_path = None
+    finally:
+        # Only set when the temp file was not moved into place
+        if temp_path:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+
+
+def _rewrite_png_keywords(image_path: str, tags_str: str) -> Tuple[bool, Optional[str]]:
+    """Re-encode a PNG through PIL with the tags as its Keywords entry."""
+    try:
+        from PIL import Image
+        from PIL.PngImagePlugin import PngInfo
+
+        with Image.open(image_path) as img:
+            pnginfo = PngInfo()
+            for k, v in (img.info or {}).items():
+                if isinstance(v, str) and k.lower() != "keywords":
+                    pnginfo.add_text(k, v)
+
+            pnginfo.add_itxt("Keywords", tags_str, lang="en", tkey="Keywords")
+            img.save(image_path, pnginfo=pnginfo)
+        return True, None
+    except Exception as png_e:
+        return False, f"Error processing PNG metadata: {png_e}"
+
+
 def extract_and_add_metadata(
-    image_path: str, tags: List[str]
+    image_path: str,
+    tags: List[str],
+    exif_dict: Optional[Dict[str, Any]] = None,
+    img_format: Optional[str] = None,
 ) -> Tuple[Dict[str, Any], bool, Optional[str]]:
-    """Extract metadata and add tags to image."""
-    tags_str = ", ".join(sorted(list(set(tags))))
+    """
+    Extract metadata and add tags to image.
+
+    exif_dict and img_format come from a caller that already opened the
+    image; for JPEGs the file is then not decoded a second time.
+    """
+    tags_str = ", ".join(sorted(set(tags)))
     extracted_metadata = {}
     write_success = False
     error_msg = None
+    fast_write_failed = False
+    splice_jpeg = False
+    splice_png = False
+
+    if exif_dict is None and img_format is None:
+        # JPEG headers are read directly, without opening the image in PIL
+        exif_dict = read_jpeg_exif(image_path)
+        if exif_dict is not None:
+            img_format = "JPEG"
+
+    if exif_dict is not None and img_format == "JPEG":
+        try:
+            return _write_jpeg_user_comment(image_path, exif_dict, tags_str), True, None
+        except Exception as e:
+            print(f"Warning: Fast EXIF write failed, rewriting image: {e}")
+            fast_write_failed = True
+
+    from PIL import Image, UnidentifiedImageError
 
     try:
         with Image.open(image_path) as img:
@@ -152,7 +503,8 @@ def extract_and_add_metadata(
 
             if img_format in ["JPEG", "TIFF"]:
                 try:
-                    exif_dict = piexif.load(img.info.get("exif", b""))
+                    if exif_dict is None:
+                        exif_dict = piexif.load(img.info.get("exif", b""))
                     extracted_metadata = _get_exif_with_names(exif_dict)
                 except Exception as e:
                     print(f"Warning: Problem loading existing EXIF: {e}")
@@ -165,54 +517,41 @@ def extract_and_add_metadata(
                     }
                     extracted_metadata = {"Info": img.info.copy()} if img.info else {}
 
-                try:
-                    if "Exif" not in exif_dict:
-                        exif_dict["Exif"] = {}
-                    exif_dict["Exif"][piexif.ExifIFD.UserComment] = (
-                        piexif.helper.UserComment.dump(tags_str, encoding="unicode")
-                    )
-                    exif_bytes = piexif.dump(exif_dict)
-
-                    save_kwargs = {"exif": exif_bytes}
-                    if img_format == "JPEG":
-                        save_kwargs["quality"] = img.info.get("quality", 95)
-                        save_kwargs["subsampling"] = img.info.get("subsampling", -1)
-                        save_kwargs["progressive"] = img.info.get("progressive", False)
-                        save_kwargs["icc_profile"] = img.info.get("icc_profile")
-
-                    img.save(image_path, **save_kwargs)
-                    write_success = True
-
-                    if "Exif" not in extracted_metadata:
-                        extracted_metadata["Exif"] = {}
-                    extracted_metadata["Exif"]["UserComment"] = tags_str
-
-                except Exception as write_e:
-                    error_msg = f"Failed to write EXIF tags: {write_e}"
+                if img_format == "JPEG" and not fast_write_failed:
+                    # Spliced in below, once the file handle is closed
+                    splice_jpeg = True
+                else:
+                    try:
+                        if "Exif" not in exif_dict:
+                            exif_dict["Exif"] = {}
+                        exif_dict["Exif"][piexif.ExifIFD.UserComment] = (
+                            piexif.helper.UserComment.dump(tags_str, encoding="unicode")
+                        )
+                        exif_bytes = piexif.dump(exif_dict)
+
+                        save_kwargs = {"exif": exif_bytes}
+                        if img_format == "JPEG":
+                            save_kwargs["quality"] = img.info.get("quality", 95)
+                            save_kwargs["subsampling"] = img.info.get("subsampling", -1)
+                            save_kwargs["progressive"] = img.info.get(
+                                "progressive", False
+                            )
+                            save_kwargs["icc_profile"] = img.info.get("icc_profile")
+
+                        img.save(image_path, **save_kwargs)
+                        write_success = True
+
+                        if "Exif" not in extracted_metadata:
+                            extracted_metadata["Exif"] = {}
+                        extracted_metadata["Exif"]["UserComment"] = tags_str
+
+                    except Exception as write_e:
+                        error_msg = f"Failed to write EXIF tags: {write_e}"
 
             elif img_format == "PNG":
-                try:
-                    existing_info = img.info or {}
-                    extracted_metadata = {"Info": existing_info.copy()}
-
-                    from PIL.PngImagePlugin import PngInfo
-
-                    pnginfo = PngInfo()
-
-                    for k, v in existing_info.items():
-                        if isinstance(v, str) and k.lower() != "keywords":
-                            pnginfo.add_text(k, v)
-
-                    pnginfo.add_itxt("Keywords", tags_str, lang="en", tkey="Keywords")
-                    img.save(image_path, pnginfo=pnginfo)
-                    write_success = True
-
-                    if "Info" not in extracted_metadata:
-                        extracted_metadata["Info"] = {}
-                    extracted_metadata["Info"]["Keywords"] = tags_str
-
-                except Exception as png_e:
-                    error_msg = f"Error processing PNG metadata: {png_e}"
+                extracted_metadata = {"Info": dict(img.info or {})}
+                # Spliced in below, once the file handle is closed
+                splice_png = True
 
             else:
                 error_msg = f"Unsupported format ({img_format}) for metadata writing."
@@ -225,6 +564,25 @@ def extract_and_add_metadata(
                 except Exception:
                     extracted_metadata = {}
 
+        if splice_jpeg:
+            try:
+                extracted_metadata = _write_jpeg_user_comment(
+                    image_path, exif_dict, tags_str
+                )
+                write_success = True
+            except Exception as write_e:
+                error_msg = f"Failed to write EXIF tags: {write_e}"
+
+        if splice_png:
+            try:
+                _splice_png_itxt(image_path, "Keywords", tags_str, lang="en")
+                write_success = True
+            except Exception as e:
+                print(f"Warning: PNG chunk splice failed, rewriting image: {e}")
+                write_success, error_msg = _rewrite_png_keywords(image_path, tags_str)
+            if write_success:
+                extracted_metadata["Info"]["Keywords"] = tags_str
+
     except UnidentifiedImageError:
         error_msg = "Cannot identify image file"
     except FileNotFoundError:
@@ -240,40 +598,115 @@ def extract_and_add_metadata(
     return extracted_metadata, write_success, error_msg
 
 
+def _extract_and_add_metadata_args(
+    args: Tuple[str, List[str]],
+) -> Tuple[Dict[str, Any], bool, Optional[str]]:
+    """Unpack a (path, tags) pair for extract_and_add_metadata."""
+    return extract_and_add_metadata(*args)
+
+
+def extract_and_add_metadata_batch(
+    image_paths: List[str],
+    tags_per_path: List[List[str]],
+    max_workers: Optional[int] = None,
+) -> List[Tuple[Dict[str, Any], bool, Optional[str]]]:
+    """
+    Extract metadata and add tags to several images concurrently.
+
+    Args:
+        image_paths: Paths of the images to tag
+        tags_per_path: Tags for each image, in the same order
+        max_workers: Worker threads, one per CPU if None
+
+    Returns:
+        extract_and_add_metadata results in the order of image_paths
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        return list(
+            executor.map(
+                _extract_and_add_metadata_args, zip(image_paths, tags_per_path)
+            )
+        )
+
+
+def compute_content_hash(filepath: str) -> str:
+    """Hash the file bytes to recognise images that were already stored."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
 def is_image_file(filepath: str) -> bool:
     """Check if file is a supported image format."""
-    return filepath.lower().endswith(tuple(Config.SUPPORTED_EXTENSIONS))
+    return os.path.splitext(filepath)[1].lower() in SUPPORTED_EXT_SET
+
+
+def iter_image_files(directory: str) -> Iterator[str]:
+    """Recursively yield supported image files using cached DirEntry types."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_image_files(entry.path)
+            elif entry.is_file() and is_image_file(entry.name):
+                yield entry.path
 
 
 def get_image_files_from_directory(directory: str) -> List[str]:
     """Get all supported image files from directory."""
-    image_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if is_image_file(file):
-                image_files.append(os.path.join(root, file))
-    return image_files
+    return list(iter_image_files(directory))
 
 
 def validate_file_path(filepath: str) -> bool:
     """Validate if file path is allowed."""
-    allowed_paths = Config.get_allowed_paths()
+    allowed_paths = Config.get_allowed_paths_tuple()
     abs_path = os.path.abspath(filepath)
 
-    for allowed_path in allowed_paths:
-        abs_allowed = os.path.abspath(allowed_path)
-        if abs_path.startswith(abs_allowed):
-            return True
-    return False
+    # Files of one directory share the answer, so check the parent first
+    if _is_allowed_path(os.path.dirname(abs_path), allowed_paths):
+        return True
+    return _is_allowed_path(abs_path, allowed_paths)
 
 
-def create_payload(image_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create payload for Qdrant from image data."""
+@lru_cache(maxsize=16)
+def _allowed_prefixes(allowed_paths: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Normalize the allowed paths once, each ending in a separator."""
+    return tuple(
+        os.path.join(os.path.abspath(allowed_path), "")
+        for allowed_path in allowed_paths
+    )
+
+
+@lru_cache(maxsize=4096)
+def _is_allowed_path(abs_path: str, allowed_paths: Tuple[str, ...]) -> bool:
+    """Check an absolute path against the allowed paths, cached per path set."""
+    # The trailing separator keeps /foo from also allowing /foobar
+    candidate = os.path.join(abs_path, "")
+    return any(
+        candidate.startswith(prefix) for prefix in _allowed_prefixes(allowed_paths)
+    )
+
+
+def create_payload(
+    image_data: Dict[str, Any], now: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create payload for Qdrant from image data.
+
+    Args:
+        image_data: Processed image data
+        now: processed_at fallback for images without a processing timestamp
+
+    Returns:
+        Payload dictionary
+    """
     return {
         "image_id": image_data.get("image_id", ""),
         "file_path": image_data.get("file_path", ""),
         "file_name": image_data.get("file_name", ""),
         "file_size": image_data.get("file_size", 0),
+        "content_hash": image_data.get("content_hash", ""),
         "width": image_data.get("width", 0),
         "height": image_data.get("height", 0),
         "format": image_data.get("format", ""),
@@ -281,11 +714,22 @@ def create_payload(image_data: Dict[str, Any]) -> Dict[str, Any]:
         "gps_coordinates": image_data.get("gps_coordinates", []),
         "location_name": image_data.get("location_name", ""),
         "ai_tags": image_data.get("ai_tags", []),
+        "ai_tags_lc": image_data.get("ai_tags_lc", []),
         "ai_description": image_data.get("ai_description", ""),
         "model_used": image_data.get("model_used", ""),
         "embedding_dim": image_data.get("embedding_dim", 0),
-        "processed_at": datetime.now().isoformat(),
+        # Ingest already timestamped the image, avoid formatting a second time
+        "processed_at": image_data.get("processing_timestamp")
+        or now
+        or datetime.now().isoformat(),
+        # lstat only, symlinked files are not resolved
         "source_type": "upload"
-        if os.path.exists(image_data.get("file_path", ""))
+        if os.path.lexists(image_data.get("file_path", ""))
         else "processing",
     }
+
+
+def create_payloads(images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Create the payloads of a batch, sharing one fallback timestamp."""
+    now = datetime.now().isoformat()
+    return [create_payload(image_data, now) for image_data in images]